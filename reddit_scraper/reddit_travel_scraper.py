@@ -10,35 +10,151 @@ Usage:
     python reddit_travel_scraper.py --location "Puerto Rico" --subreddits "travel,solotravel"
 """
 
-import praw
+import asyncio
+import asyncpraw
+from asyncprawcore.exceptions import (
+    BadRequest, Forbidden, NotFound, Redirect, TooManyRequests, URITooLong
+)
 import json
 import time
 import argparse
 import os
 import re
+import sys
+from collections import Counter
+from functools import lru_cache
 from datetime import datetime, timezone
 from dotenv import load_dotenv
-from typing import List, Dict, Any, Optional
+from loguru import logger as log
+from typing import List, Dict, Any, Optional, Sequence, Tuple
+
+# google-re2 compiles the place-name pattern to a DFA, so long capitalized
+# runs are scanned in linear time instead of backtracking per suffix
+try:
+    import re2 as place_regex
+except ImportError:
+    place_regex = re
+
+# pyahocorasick matches all recommendation keywords in one pass over a comment
+try:
+    import ahocorasick
+except ImportError:
+    ahocorasick = None
+
+# orjson serializes results in C; json is kept as the fallback writer
+try:
+    import orjson
+except ImportError:
+    orjson = None
 
 # Load environment variables
 load_dotenv()
 
+# Max in-flight (subreddit, search term) requests; keeps us well inside
+# Reddit's 600 requests / 600s budget
+SEARCH_CONCURRENCY = 8
+
+# 429 handling: retries per request, and the backoff cap when Reddit sends
+# no usable Retry-After
+MAX_RATE_LIMIT_RETRIES = 3
+MAX_RATE_LIMIT_BACKOFF = 60
+
+# How much of a selftext / comment body is scanned; long essays are sliced
+# before lowercasing so we never copy the full text
+RELEVANCE_SCAN_CHARS = 2000
+COMMENT_SCAN_CHARS = 1000
+
+# Capitalized phrases ending in a place-type suffix, or a quoted name (group 1).
+# Quoted names are matched at any length so quotes pair up left to right;
+# short ones are dropped by the length filter in _extract_place_names
+_PLACE_RE = place_regex.compile(
+    r'\b[A-Z][a-zA-Z\s&]+(?:Restaurant|Bar|Cafe|Museum|Park|Beach|Market|Street|Avenue|Plaza|Center|House|Building|Tower|Mall|Store)\b'
+    r'|"([^"]*)"'
+)
+_UNSAFE_FILENAME_RE = re.compile(r'[^a-zA-Z0-9_-]')
+
+RECOMMENDATION_KEYWORDS = (
+    'recommend', 'must visit', 'check out', 'go to', 'try',
+    'best', 'favorite', 'love', 'amazing', 'great',
+    'restaurant', 'food', 'eat', 'bar', 'drink',
+    'attraction', 'museum', 'park', 'beach', 'hiking'
+)
+
+if ahocorasick is not None:
+    _REC_AUTOMATON = ahocorasick.Automaton()
+    for _keyword in RECOMMENDATION_KEYWORDS:
+        _REC_AUTOMATON.add_word(_keyword, _keyword)
+    _REC_AUTOMATON.make_automaton()
+
+    def _has_recommendation_keyword(text: str) -> bool:
+        """Whether lowercased text contains any recommendation keyword"""
+        return next(_REC_AUTOMATON.iter(text), None) is not None
+else:
+    _REC_KEYWORD_RE = re.compile('|'.join(re.escape(kw) for kw in RECOMMENDATION_KEYWORDS))
+
+    def _has_recommendation_keyword(text: str) -> bool:
+        """Whether lowercased text contains any recommendation keyword"""
+        return _REC_KEYWORD_RE.search(text) is not None
+
+@lru_cache(maxsize=256)
+def _relevance_re(location: str) -> Optional[re.Pattern]:
+    """Word-boundary alternation of the location's keywords (3+ chars)"""
+    keywords = [kw for kw in re.findall(r'\w+', location.lower()) if len(kw) > 2]
+    if not keywords:
+        return None
+    return re.compile(r'\b(?:' + '|'.join(re.escape(kw) for kw in keywords) + r')\b')
+
+# US state (and territory) name -> abbreviation
+_STATE_ABBR = {
+    "alabama": "AL", "alaska": "AK", "arizona": "AZ", "arkansas": "AR",
+    "california": "CA", "colorado": "CO", "connecticut": "CT", "delaware": "DE",
+    "florida": "FL", "georgia": "GA", "hawaii": "HI", "idaho": "ID",
+    "illinois": "IL", "indiana": "IN", "iowa": "IA", "kansas": "KS",
+    "kentucky": "KY", "louisiana": "LA", "maine": "ME", "maryland": "MD",
+    "massachusetts": "MA", "michigan": "MI", "minnesota": "MN", "mississippi": "MS",
+    "missouri": "MO", "montana": "MT", "nebraska": "NE", "nevada": "NV",
+    "new hampshire": "NH", "new jersey": "NJ", "new mexico": "NM", "new york": "NY",
+    "north carolina": "NC", "north dakota": "ND", "ohio": "OH", "oklahoma": "OK",
+    "oregon": "OR", "pennsylvania": "PA", "rhode island": "RI", "south carolina": "SC",
+    "south dakota": "SD", "tennessee": "TN", "texas": "TX", "utah": "UT",
+    "vermont": "VT", "virginia": "VA", "washington": "WA", "west virginia": "WV",
+    "wisconsin": "WI", "wyoming": "WY", "district of columbia": "DC", "puerto rico": "PR",
+}
+# Lowercased abbreviation -> state name, so "Austin, TX" resolves too
+_STATE_NAME = {abbr.lower(): name for name, abbr in _STATE_ABBR.items()}
+
 class RedditTravelScraper:
     def __init__(self):
         """Initialize Reddit API client"""
-        self.reddit = praw.Reddit(
+        self.reddit = asyncpraw.Reddit(
             client_id=os.getenv('REDDIT_CLIENT_ID'),
             client_secret=os.getenv('REDDIT_CLIENT_SECRET'),
-            user_agent=os.getenv('REDDIT_USER_AGENT', 'RouteWise:v1.0 (by u/routewise)')
+            user_agent=os.getenv('REDDIT_USER_AGENT', 'RouteWise:v1.0 (by u/routewise)'),
+            # Only covers RATELIMIT API errors on write actions: raise them
+            # instead of sleeping. asyncprawcore still paces reads from the
+            # X-Ratelimit-* headers, and _retry_rate_limited handles 429s
+            ratelimit_seconds=0
         )
-        
-        # Test authentication
+        # Subreddit handles shared by every search against the same subreddit
+        self._sub_handles = {}
+        # Subreddits that are private, banned or missing; skipped for the
+        # remaining search terms
+        self._bad_subs = set()
+    
+    async def check_auth(self):
+        """Test authentication"""
         try:
-            print(f"✅ Authenticated as: {self.reddit.user.me()}")
+            log.info("✅ Authenticated as: {}", await self.reddit.user.me())
         except:
-            print("✅ Reddit API connected (read-only mode)")
+            log.info("✅ Reddit API connected (read-only mode)")
     
-    def find_relevant_subreddits(self, location: str) -> List[str]:
+    async def close(self):
+        """Close the underlying HTTP session"""
+        await self.reddit.close()
+    
+    @staticmethod
+    @lru_cache(maxsize=1024)
+    def find_relevant_subreddits(location: str) -> Tuple[str, ...]:
         """Find subreddits related to a location"""
         location_clean = location.lower().replace(" ", "").replace(",", "")
         city_name = location.split(",")[0].strip().lower().replace(" ", "")
@@ -62,71 +178,165 @@ class RedditTravelScraper:
             parts = [part.strip() for part in location.split(",")]
             if len(parts) == 2:
                 city, state = parts
-                state_abbr = self._get_state_abbreviation(state)
+                state_abbr = RedditTravelScraper._get_state_abbreviation(state)
                 if state_abbr:
                     location_subreddits.extend([
                         state_abbr.lower(),
                         f"{city.lower().replace(' ', '')}{state_abbr.lower()}",
                     ])
         
-        return base_subreddits + location_subreddits
+        # "Austin, TX" yields "austintx" twice; keep first occurrence only
+        return tuple(dict.fromkeys(base_subreddits + location_subreddits))
     
-    def _get_state_abbreviation(self, state: str) -> Optional[str]:
-        """Get US state abbreviation"""
-        states = {
-            "texas": "TX", "california": "CA", "florida": "FL",
-            "new york": "NY", "illinois": "IL", "pennsylvania": "PA",
-            "puerto rico": "PR", "hawaii": "HI", "alaska": "AK"
-        }
-        return states.get(state.lower())
+    @staticmethod
+    def _get_state_abbreviation(state: str) -> Optional[str]:
+        """Get US state abbreviation from a state name or abbreviation"""
+        state_lower = state.lower()
+        if state_lower in _STATE_NAME:
+            return state.upper()
+        return _STATE_ABBR.get(state_lower)
     
-    def search_travel_posts(self, location: str, subreddits: List[str], limit: int = 25) -> List[Dict]:
+    async def search_travel_posts(self, location: str, subreddits: Sequence[str], limit: int = 25,
+                                  concurrency: int = SEARCH_CONCURRENCY) -> List[Dict]:
         """Search for posts about a location across multiple subreddits"""
+        search_query = self._build_search_query(location)
+        semaphore = asyncio.Semaphore(concurrency)
+        # Post ids already claimed by a task; shared so overlapping search
+        # terms never return the same submission twice
+        seen_ids = set()
+        
+        log.info("🔍 Searching for '{}' recommendations...", location)
+        log.info("📍 Search query: {}...", search_query[:80])
+        log.info("🏛️  Subreddits: {}...", ', '.join(subreddits[:5]))
+        
+        # Phase 1: one task per subreddit, bounded by the semaphore. Only
+        # listing data is fetched here.
+        tasks = [
+            self._search_subreddit(subreddit_name, location, limit, semaphore, seen_ids)
+            for subreddit_name in subreddits
+        ]
+        results = await asyncio.gather(*tasks, return_exceptions=True)
+        
         posts = []
-        search_terms = self._generate_search_terms(location)
+        for result in results:
+            if isinstance(result, Exception):
+                log.warning("⚠️  Search task failed: {}", result)
+                continue
+            posts.extend(result)
+        
+        # Sort by relevance
+        selected = sorted(posts, key=lambda x: x.score, reverse=True)[:limit]
         
-        print(f"🔍 Searching for '{location}' recommendations...")
-        print(f"📍 Search terms: {', '.join(search_terms[:3])}...")
-        print(f"🏛️  Subreddits: {', '.join(subreddits[:5])}...")
+        # Phase 2: expand comment trees only for the posts we keep
+        post_data = await asyncio.gather(*[
+            self._extract_post_data(post, location, semaphore) for post in selected
+        ])
         
-        for subreddit_name in subreddits:
+        return [data for data in post_data if data]
+    
+    async def _search_subreddit(self, subreddit_name: str, location: str, limit: int,
+                                semaphore: asyncio.Semaphore, seen_ids: set) -> List:
+        """Search one subreddit for a location, returning relevant submissions"""
+        posts = []
+        
+        async with semaphore:
+            # Another task may have found it inaccessible while we waited
+            if subreddit_name in self._bad_subs:
+                return posts
+            
             try:
-                subreddit = self.reddit.subreddit(subreddit_name)
-                
-                # Search posts in this subreddit
-                for search_term in search_terms:
-                    try:
-                        search_results = subreddit.search(
-                            search_term,
-                            limit=limit // len(search_terms),
-                            time_filter='year',
-                            sort='relevance'
-                        )
-                        
-                        for post in search_results:
-                            if self._is_relevant_post(post, location):
-                                post_data = self._extract_post_data(post, location)
-                                if post_data:
-                                    posts.append(post_data)
-                                    print(f"📝 Found: '{post.title[:50]}...' ({post.score} upvotes)")
-                        
-                        time.sleep(1)  # Rate limiting
-                        
-                    except Exception as e:
-                        print(f"⚠️  Search error in r/{subreddit_name}: {e}")
-                        continue
-                        
+                subreddit = self._sub_handles.get(subreddit_name)
+                if subreddit is None:
+                    subreddit = await self.reddit.subreddit(subreddit_name)
+                    self._sub_handles[subreddit_name] = subreddit
             except Exception as e:
-                print(f"⚠️  Subreddit r/{subreddit_name} not accessible: {e}")
-                continue
+                self._bad_subs.add(subreddit_name)
+                log.warning("⚠️  Subreddit r/{} not accessible: {}", subreddit_name, e)
+                return posts
+            
+            async def fetch_listing(query: str, listing_limit: int):
+                search_results = subreddit.search(
+                    query,
+                    limit=listing_limit,
+                    time_filter='year',
+                    sort='relevance'
+                )
+                return [post async for post in search_results]
+            
+            try:
+                # All search terms OR'ed together: one request per subreddit
+                query = self._build_search_query(location)
+                results = await self._retry_rate_limited(lambda: fetch_listing(query, limit))
+            except (Forbidden, NotFound, Redirect) as e:
+                # Private/banned subs 403/404; missing ones redirect to search
+                self._bad_subs.add(subreddit_name)
+                log.warning("⚠️  Subreddit r/{} not accessible: {}", subreddit_name, e)
+                return posts
+            except TooManyRequests as e:
+                # Retries already ran out; per-term searches would only
+                # multiply the requests Reddit is refusing
+                log.warning("⚠️  Still rate limited in r/{}, skipping: {}", subreddit_name, e)
+                return posts
+            except (BadRequest, URITooLong) as e:
+                # The OR'ed query was rejected as malformed or too long
+                log.warning("⚠️  Combined search failed in r/{}, searching per term: {}", subreddit_name, e)
+                results = await self._search_terms_individually(subreddit_name, location, limit, fetch_listing)
+            
+            for post in results:
+                if post.id in seen_ids:
+                    continue
+                seen_ids.add(post.id)
+                if not self._is_relevant_post(self._post_search_text(post), location):
+                    continue
+                posts.append(post)
+                log.info("📝 Found: '{}...' ({} upvotes)", post.title[:50], post.score)
+            
+            await asyncio.sleep(1)  # Rate limiting
+        
+        return posts
+    
+    async def _search_terms_individually(self, subreddit_name: str, location: str, limit: int,
+                                         fetch_listing) -> List:
+        """Fallback: one search per term, as before query batching"""
+        search_terms = self._generate_search_terms(location)
+        results = []
         
-        # Remove duplicates and sort by relevance
-        unique_posts = {post['id']: post for post in posts}.values()
-        sorted_posts = sorted(unique_posts, key=lambda x: x['score'], reverse=True)
+        for search_term in search_terms:
+            try:
+                results.extend(await self._retry_rate_limited(
+                    lambda: fetch_listing(search_term, limit // len(search_terms))
+                ))
+            except TooManyRequests as e:
+                log.warning("⚠️  Still rate limited in r/{}, skipping remaining terms: {}", subreddit_name, e)
+                break
+            except Exception as e:
+                log.warning("⚠️  Search error in r/{}: {}", subreddit_name, e)
+            
+            await asyncio.sleep(1)  # Rate limiting
         
-        return sorted_posts[:limit]
+        return results
+    
+    async def _retry_rate_limited(self, fetch):
+        """Await fetch(), backing off and retrying when Reddit answers 429"""
+        for attempt in range(MAX_RATE_LIMIT_RETRIES + 1):
+            try:
+                return await fetch()
+            except TooManyRequests as e:
+                if attempt == MAX_RATE_LIMIT_RETRIES:
+                    raise
+                
+                try:
+                    delay = float(e.retry_after)
+                except (TypeError, ValueError):
+                    delay = 2 ** attempt
+                delay = min(delay, MAX_RATE_LIMIT_BACKOFF)
+                
+                log.warning("⏳ Rate limited, retrying in {:.0f}s", delay)
+                await asyncio.sleep(delay)
     
-    def _generate_search_terms(self, location: str) -> List[str]:
+    @staticmethod
+    @lru_cache(maxsize=1024)
+    def _generate_search_terms(location: str) -> Tuple[str, ...]:
         """Generate search terms for a location"""
         city = location.split(",")[0].strip()
         
@@ -143,76 +353,95 @@ class RedditTravelScraper:
             f"{city} attractions"
         ]
         
-        return terms
+        return tuple(terms)
     
-    def _is_relevant_post(self, post, location: str) -> bool:
-        """Check if post is relevant to the location"""
-        location_keywords = location.lower().split()
-        title_lower = post.title.lower()
-        selftext_lower = (post.selftext or "").lower()
-        
-        # Check if location appears in title or content
-        for keyword in location_keywords:
-            if len(keyword) > 2 and (keyword in title_lower or keyword in selftext_lower):
-                return True
+    @staticmethod
+    @lru_cache(maxsize=1024)
+    def _build_search_query(location: str) -> str:
+        """OR the search terms into one Reddit search query"""
+        return ' OR '.join(
+            term if term.startswith('"') else f"({term})"
+            for term in RedditTravelScraper._generate_search_terms(location)
+        )
+    
+    @staticmethod
+    def _post_search_text(post) -> str:
+        """Title plus selftext head, lowercased once into a single buffer"""
+        return (post.title + "\n" + (post.selftext or "")[:RELEVANCE_SCAN_CHARS]).lower()
+    
+    def _is_relevant_post(self, post_text: str, location: str) -> bool:
+        """Check if the post's lowercased search text mentions the location"""
+        pattern = _relevance_re(location)
+        if pattern is None:
+            return False
         
-        return False
+        return pattern.search(post_text) is not None
     
-    def _extract_post_data(self, post, location: str) -> Dict[str, Any]:
+    async def _extract_post_data(self, post, location: str, semaphore: asyncio.Semaphore) -> Optional[Dict[str, Any]]:
         """Extract relevant data from Reddit post"""
         try:
-            # Get top comments with recommendations
-            post.comments.replace_more(limit=3)
-            comments = self._extract_recommendations_from_comments(
-                post.comments.list(), location
-            )
-            
-            return {
-                'id': post.id,
-                'title': post.title,
-                'author': str(post.author) if post.author else '[deleted]',
-                'score': post.score,
-                'upvote_ratio': post.upvote_ratio,
-                'num_comments': post.num_comments,
-                'created_utc': post.created_utc,
-                'url': f"https://reddit.com{post.permalink}",
-                'selftext': post.selftext[:500] if post.selftext else None,
-                'subreddit': str(post.subreddit),
-                'location': location,
-                'recommendations': comments,
-                'scraped_at': datetime.now(timezone.utc).isoformat()
-            }
+            post_data = self._extract_post_meta(post, location)
+            post_data['recommendations'] = await self._fetch_comments(post, location, semaphore)
+            return post_data
         except Exception as e:
-            print(f"⚠️  Error extracting post data: {e}")
+            log.warning("⚠️  Error extracting post data: {}", e)
             return None
     
-    def _extract_recommendations_from_comments(self, comments: List, location: str, min_score: int = 2) -> List[Dict]:
+    async def _fetch_comments(self, post, location: str, semaphore: asyncio.Semaphore) -> List[Dict]:
+        """Fetch a post's comment tree and extract recommendations"""
+        async def fetch_comment_list():
+            # Listing results come back without their comment forest
+            await post.load()
+            await post.comments.replace_more(limit=3)
+            return await post.comments.list()
+        
+        async with semaphore:
+            comments = await self._retry_rate_limited(fetch_comment_list)
+        
+        return await self._extract_recommendations_from_comments(comments, location)
+    
+    def _extract_post_meta(self, post, location: str) -> Dict[str, Any]:
+        """Extract listing-level post fields (no network)"""
+        selftext_head = (post.selftext or '')[:500]
+        
+        return {
+            'id': post.id,
+            'title': post.title,
+            'author': str(post.author) if post.author else '[deleted]',
+            'score': post.score,
+            'upvote_ratio': post.upvote_ratio,
+            'num_comments': post.num_comments,
+            'created_utc': post.created_utc,
+            'url': f"https://reddit.com{post.permalink}",
+            'selftext': selftext_head or None,
+            'subreddit': str(post.subreddit),
+            'location': location,
+            'recommendations': [],
+            'scraped_at': datetime.now(timezone.utc).isoformat()
+        }
+    
+    async def _extract_recommendations_from_comments(self, comments: List, location: str, min_score: int = 2) -> List[Dict]:
         """Extract recommendations from post comments"""
         recommendations = []
-        recommendation_keywords = [
-            'recommend', 'must visit', 'check out', 'go to', 'try',
-            'best', 'favorite', 'love', 'amazing', 'great',
-            'restaurant', 'food', 'eat', 'bar', 'drink',
-            'attraction', 'museum', 'park', 'beach', 'hiking'
-        ]
         
         for comment in comments[:10]:  # Top 10 comments only
             if comment.score < min_score:
                 continue
                 
-            comment_text = comment.body.lower()
+            body_head = comment.body[:COMMENT_SCAN_CHARS]
+            comment_text = body_head.lower()
             
             # Check if comment contains recommendations
-            if any(keyword in comment_text for keyword in recommendation_keywords):
+            if _has_recommendation_keyword(comment_text):
                 # Extract potential place names (capitalized words/phrases)
-                places = self._extract_place_names(comment.body)
+                places = self._extract_place_names(body_head)
                 
                 if places:
                     recommendations.append({
                         'comment_id': comment.id,
                         'author': str(comment.author) if comment.author else '[deleted]',
                         'score': comment.score,
-                        'text': comment.body[:300],  # First 300 chars
+                        'text': body_head[:300],  # First 300 chars
                         'places': places,
                         'url': f"https://reddit.com{comment.permalink}"
                     })
@@ -220,17 +449,21 @@ class RedditTravelScraper:
         return recommendations
     
     def _extract_place_names(self, text: str) -> List[str]:
-        """Extract potential place names from text"""
-        # Simple regex to find capitalized words (potential place names)
-        place_pattern = r'\b[A-Z][a-zA-Z\s&]+(?:Restaurant|Bar|Cafe|Museum|Park|Beach|Market|Street|Avenue|Plaza|Center|House|Building|Tower|Mall|Store)\b'
-        places = re.findall(place_pattern, text)
+        """Extract potential place names from text
         
-        # Also look for quoted places or specific patterns
-        quoted_places = re.findall(r'"([^"]*)"', text)
+        >>> RedditTravelScraper._extract_place_names(None, 'Try "ok" then "Casa Bacardi" tour')
+        ['Casa Bacardi']
+        """
+        # Single pass: capitalized place-type phrases and quoted names
+        all_places = [
+            match.group(1) if match.group(1) is not None else match.group(0)
+            for match in _PLACE_RE.finditer(text)
+        ]
         
-        # Clean and deduplicate
-        all_places = places + [p for p in quoted_places if len(p) > 3]
-        clean_places = list(set([p.strip() for p in all_places if len(p.strip()) > 3]))
+        # Clean and deduplicate, keeping first-mention order
+        clean_places = list(dict.fromkeys(
+            place for place in (p.strip() for p in all_places) if len(place) > 3
+        ))
         
         return clean_places[:5]  # Max 5 places per comment
     
@@ -239,7 +472,7 @@ class RedditTravelScraper:
         os.makedirs(output_dir, exist_ok=True)
         
         timestamp = int(time.time())
-        location_safe = re.sub(r'[^a-zA-Z0-9_-]', '_', location.lower())
+        location_safe = _UNSAFE_FILENAME_RE.sub('_', location.lower())
         filename = f"{output_dir}/reddit_travel_{location_safe}_{timestamp}.json"
         
         output = {
@@ -250,55 +483,47 @@ class RedditTravelScraper:
             'summary': self._generate_summary(posts)
         }
         
-        with open(filename, 'w', encoding='utf-8') as f:
-            json.dump(output, f, indent=2, ensure_ascii=False)
+        if orjson is not None:
+            with open(filename, 'wb') as f:
+                f.write(orjson.dumps(output, option=orjson.OPT_INDENT_2))
+        else:
+            with open(filename, 'w', encoding='utf-8') as f:
+                json.dump(output, f, indent=2, ensure_ascii=False)
         
         return filename
     
     def _generate_summary(self, posts: List[Dict]) -> Dict:
         """Generate summary of recommendations"""
-        all_places = []
+        place_counts = Counter()
         subreddits = set()
         total_recommendations = 0
+        total_score = 0
         
+        # Single pass: count place mentions as we walk the recommendations
         for post in posts:
             subreddits.add(post['subreddit'])
+            total_score += post['score']
             for rec in post['recommendations']:
                 total_recommendations += 1
-                all_places.extend(rec['places'])
-        
-        # Count place mentions
-        place_counts = {}
-        for place in all_places:
-            place_counts[place] = place_counts.get(place, 0) + 1
-        
-        top_places = sorted(place_counts.items(), key=lambda x: x[1], reverse=True)[:10]
+                place_counts.update(rec['places'])
         
         return {
             'total_posts': len(posts),
             'total_recommendations': total_recommendations,
             'subreddits_found': list(subreddits),
-            'top_mentioned_places': top_places,
-            'avg_post_score': sum(p['score'] for p in posts) / len(posts) if posts else 0
+            'top_mentioned_places': place_counts.most_common(10),
+            'avg_post_score': total_score / len(posts) if posts else 0
         }
 
-def main():
-    parser = argparse.ArgumentParser(description='Scrape Reddit for travel recommendations')
-    parser.add_argument('--location', required=True, help='Location to search for (e.g., "Austin, TX")')
-    parser.add_argument('--subreddits', help='Comma-separated subreddits (default: auto-detect)')
-    parser.add_argument('--limit', type=int, default=25, help='Max posts to find (default: 25)')
-    parser.add_argument('--output', default='output', help='Output directory (default: output)')
-    
-    args = parser.parse_args()
-    
-    # Check environment variables
-    if not os.getenv('REDDIT_CLIENT_ID'):
-        print("❌ Missing REDDIT_CLIENT_ID environment variable")
-        print("   Copy .env.example to .env and add your Reddit API credentials")
-        return
-    
+async def run(args):
     scraper = RedditTravelScraper()
-    
+    try:
+        await scraper.check_auth()
+        await scrape(scraper, args)
+    finally:
+        await scraper.close()
+
+async def scrape(scraper: RedditTravelScraper, args):
     # Determine subreddits to search
     if args.subreddits:
         subreddits = [s.strip() for s in args.subreddits.split(',')]
@@ -311,7 +536,9 @@ def main():
     print(f"🏛️  Subreddits: {len(subreddits)} subreddits\n")
     
     # Scrape posts
-    posts = scraper.search_travel_posts(args.location, subreddits, args.limit)
+    posts = await scraper.search_travel_posts(args.location, subreddits, args.limit)
+    # Flush queued scrape logs before printing the summary
+    await log.complete()
     
     if not posts:
         print(f"\n❌ No travel recommendations found for '{args.location}'")
@@ -335,5 +562,26 @@ def main():
             rec_count = len(post['recommendations'])
             print(f"   • {post['title'][:50]}... ({post['score']} upvotes, {rec_count} recs)")
 
+def main():
+    parser = argparse.ArgumentParser(description='Scrape Reddit for travel recommendations')
+    parser.add_argument('--location', required=True, help='Location to search for (e.g., "Austin, TX")')
+    parser.add_argument('--subreddits', help='Comma-separated subreddits (default: auto-detect)')
+    parser.add_argument('--limit', type=int, default=25, help='Max posts to find (default: 25)')
+    parser.add_argument('--output', default='output', help='Output directory (default: output)')
+    
+    args = parser.parse_args()
+    
+    # Check environment variables
+    if not os.getenv('REDDIT_CLIENT_ID'):
+        print("❌ Missing REDDIT_CLIENT_ID environment variable")
+        print("   Copy .env.example to .env and add your Reddit API credentials")
+        return
+    
+    # Log from a background thread so the event loop never blocks on the terminal
+    log.remove()
+    log.add(sys.stderr, enqueue=True, level='INFO', format='{message}')
+    
+    asyncio.run(run(args))
+
 if __name__ == "__main__":
     main()
@@ -4,11 +4,10 @@ Debug script to test attraction queries with the correct query ID: c2e5695e93938
 """
 
 import asyncio
-import json
 import httpx
-import random
-import string
-from loguru import logger as log
+import orjson
+from http_client import ACCEPT_ENCODING, request_id
+from rate_limiter import AIMDLimiter
 
 async def debug_attractions_query():
     """Debug attractions GraphQL query with different payload structures"""
@@ -16,16 +15,13 @@ async def debug_attractions_query():
     location_id = "2665727"  # Isla Verde location ID we found
     query_id = "c2e5695e939386e4"  # Working query ID provided by user
     
-    def generate_request_id(length=180):
-        return ''.join(random.choices(string.ascii_lowercase + string.digits, k=length))
-    
     headers = {
         "User-Agent": "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
         "Accept": "*/*",
         "Accept-Language": "en-US,en;q=0.9",
-        "Accept-Encoding": "gzip, deflate, br",
+        "Accept-Encoding": ACCEPT_ENCODING,
         "Content-Type": "application/json",
-        "X-Requested-By": generate_request_id(),
+        "X-Requested-By": request_id(),
         "Referer": "https://www.tripadvisor.com/",
         "Origin": "https://www.tripadvisor.com",
         "Connection": "keep-alive",
@@ -102,26 +98,37 @@ async def debug_attractions_query():
     
     url = "https://www.tripadvisor.com/data/graphql/ids"
     
+    limiter = AIMDLimiter(max_concurrency=3)
+    
     async with httpx.AsyncClient(http2=True, headers=headers, timeout=httpx.Timeout(30.0)) as client:
         
-        for i, payload in enumerate(test_payloads, 1):
+        async def probe(payload):
+            return await limiter.run_with_retry(lambda: client.post(url, content=orjson.dumps(payload)))
+        
+        responses = await asyncio.gather(
+            *[probe(payload) for payload in test_payloads], return_exceptions=True
+        )
+        
+        for i, (payload, response) in enumerate(zip(test_payloads, responses), 1):
             print(f"\n{'='*60}")
             print(f"🧪 TESTING PAYLOAD STRUCTURE {i}")
             print(f"{'='*60}")
-            print(f"📋 Payload: {json.dumps(payload, indent=2)}")
+            print(f"📋 Payload: {orjson.dumps(payload, option=orjson.OPT_INDENT_2).decode()}")
             
             try:
-                response = await client.post(url, json=payload)
+                if isinstance(response, Exception):
+                    raise response
                 
                 print(f"📊 Status Code: {response.status_code}")
                 
                 if response.status_code == 200:
                     try:
-                        data = response.json()
+                        data = orjson.loads(response.content)
                         
                         # Print response structure
                         print(f"📄 Response structure:")
-                        print(json.dumps(data, indent=2)[:2000] + ("..." if len(str(data)) > 2000 else ""))
+                        blob = orjson.dumps(data, option=orjson.OPT_INDENT_2).decode()
+                        print(blob[:2000] + ("..." if len(blob) > 2000 else ""))
                         
                         # Try to find attractions in response
                         attractions_found = False
@@ -151,7 +158,7 @@ async def debug_attractions_query():
                         else:
                             print("⚠️ No obvious attractions data found")
                             
-                    except json.JSONDecodeError as e:
+                    except orjson.JSONDecodeError as e:
                         print(f"❌ JSON decode error: {e}")
                         print(f"Raw response: {response.text[:500]}...")
                         
@@ -163,9 +170,6 @@ async def debug_attractions_query():
                     
             except Exception as e:
                 print(f"❌ Request failed: {e}")
-            
-            # Delay between requests
-            await asyncio.sleep(2)
     
     print(f"\n{'='*60}")
     print("🏁 TESTING COMPLETED")
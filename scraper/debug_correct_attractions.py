@@ -5,27 +5,23 @@ Since it expects Typeahead_RequestInput, let's search for "Isla Verde attraction
 """
 
 import asyncio
-import json
 import httpx
-import random
-import string
-from loguru import logger as log
+import orjson
+from http_client import ACCEPT_ENCODING, request_id
+from rate_limiter import AIMDLimiter
 
 async def search_attractions_correctly():
     """Use the typeahead query to search for attractions in Isla Verde"""
     
     query_id = "c2e5695e939386e4"
     
-    def generate_request_id(length=180):
-        return ''.join(random.choices(string.ascii_lowercase + string.digits, k=length))
-    
     headers = {
         "User-Agent": "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
         "Accept": "*/*",
         "Accept-Language": "en-US,en;q=0.9",
-        "Accept-Encoding": "gzip, deflate, br",
+        "Accept-Encoding": ACCEPT_ENCODING,
         "Content-Type": "application/json",
-        "X-Requested-By": generate_request_id(),
+        "X-Requested-By": request_id(),
         "Referer": "https://www.tripadvisor.com/",
         "Origin": "https://www.tripadvisor.com",
         "Connection": "keep-alive",
@@ -46,49 +42,60 @@ async def search_attractions_correctly():
     
     url = "https://www.tripadvisor.com/data/graphql/ids"
     
+    def build_payload(query):
+        # Use the same structure that worked for location search
+        return [{
+            "variables": {
+                "request": {
+                    "query": query,
+                    "limit": 10,
+                    "scope": "WORLDWIDE",
+                    "locale": "en-US", 
+                    "scopeGeoId": 1,
+                    "searchCenter": None,
+                    "types": ["LOCATION"],
+                    "locationTypes": [
+                        "GEO", "AIRPORT", "ACCOMMODATION", "ATTRACTION",
+                        "ATTRACTION_PRODUCT", "EATERY", "NEIGHBORHOOD",
+                        "AIRLINE", "SHOPPING", "UNIVERSITY", "GENERAL_HOSPITAL",
+                        "PORT", "FERRY", "CORPORATION", "VACATION_RENTAL",
+                        "SHIP", "CRUISE_LINE", "CAR_RENTAL_OFFICE"
+                    ],
+                    "userId": None,
+                    "context": {},
+                    "enabledFeatures": ["articles"],
+                    "includeRecent": True
+                }
+            },
+            "query": query_id,
+            "extensions": {"preRegisteredQueryId": query_id}
+        }]
+    
+    limiter = AIMDLimiter(max_concurrency=3)
+    
     async with httpx.AsyncClient(http2=True, headers=headers, timeout=httpx.Timeout(30.0)) as client:
         
-        for query in search_queries:
+        async def probe(query):
+            return await limiter.run_with_retry(lambda: client.post(url, content=orjson.dumps(build_payload(query))))
+        
+        responses = await asyncio.gather(
+            *[probe(query) for query in search_queries], return_exceptions=True
+        )
+        
+        for query, response in zip(search_queries, responses):
             print(f"\n{'='*60}")
             print(f"🔍 SEARCHING FOR: {query}")
             print(f"{'='*60}")
             
-            # Use the same structure that worked for location search
-            payload = [{
-                "variables": {
-                    "request": {
-                        "query": query,
-                        "limit": 10,
-                        "scope": "WORLDWIDE",
-                        "locale": "en-US", 
-                        "scopeGeoId": 1,
-                        "searchCenter": None,
-                        "types": ["LOCATION"],
-                        "locationTypes": [
-                            "GEO", "AIRPORT", "ACCOMMODATION", "ATTRACTION",
-                            "ATTRACTION_PRODUCT", "EATERY", "NEIGHBORHOOD",
-                            "AIRLINE", "SHOPPING", "UNIVERSITY", "GENERAL_HOSPITAL",
-                            "PORT", "FERRY", "CORPORATION", "VACATION_RENTAL",
-                            "SHIP", "CRUISE_LINE", "CAR_RENTAL_OFFICE"
-                        ],
-                        "userId": None,
-                        "context": {},
-                        "enabledFeatures": ["articles"],
-                        "includeRecent": True
-                    }
-                },
-                "query": query_id,
-                "extensions": {"preRegisteredQueryId": query_id}
-            }]
-            
             try:
-                response = await client.post(url, json=payload)
+                if isinstance(response, Exception):
+                    raise response
                 
                 print(f"📊 Status Code: {response.status_code}")
                 
                 if response.status_code == 200:
                     try:
-                        data = response.json()
+                        data = orjson.loads(response.content)
                         
                         if isinstance(data, list) and len(data) > 0:
                             first_item = data[0]
@@ -119,7 +126,7 @@ async def search_attractions_correctly():
                                     
                                     print()
                             
-                    except json.JSONDecodeError as e:
+                    except orjson.JSONDecodeError as e:
                         print(f"❌ JSON decode error: {e}")
                         
                 elif response.status_code == 403:
@@ -130,8 +137,6 @@ async def search_attractions_correctly():
                     
             except Exception as e:
                 print(f"❌ Request failed: {e}")
-            
-            await asyncio.sleep(2)
     
     print(f"\n{'='*60}")
     print("🏁 ATTRACTION SEARCH COMPLETED")
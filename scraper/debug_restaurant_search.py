@@ -4,27 +4,30 @@ Debug restaurant searches to see what TripAdvisor returns
 """
 
 import asyncio
-import json
-import httpx
-import random
-import string
-from loguru import logger as log
+import orjson
+import re
+import sys
+from http_client import close_client, get_client, request_id
+from rate_limiter import AIMDLimiter
+
+# One scan per URL instead of a substring check per kind
+_URL_KIND_RE = re.compile(r"(?P<kind>Restaurant_Review|Attraction_Review|Hotel_Review)")
+_URL_KIND_LABELS = {
+    "Restaurant_Review": "      🍽️ *** RESTAURANT URL ***",
+    "Attraction_Review": "      🎯 Attraction URL",
+    "Hotel_Review": "      🏨 Hotel URL",
+}
 
 async def debug_restaurant_searches():
     """Debug what we get when searching for restaurants"""
     
     query_id = "c2e5695e939386e4"
     
-    def generate_request_id(length=180):
-        return ''.join(random.choices(string.ascii_lowercase + string.digits, k=length))
-    
+    # User-Agent, Accept-Language and Accept-Encoding come from the shared client
     headers = {
-        "User-Agent": "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
         "Accept": "*/*",
-        "Accept-Language": "en-US,en;q=0.9",
-        "Accept-Encoding": "gzip, deflate, br",
         "Content-Type": "application/json",
-        "X-Requested-By": generate_request_id(),
+        "X-Requested-By": request_id(),
         "Referer": "https://www.tripadvisor.com/",
         "Origin": "https://www.tripadvisor.com",
         "Connection": "keep-alive",
@@ -44,94 +47,126 @@ async def debug_restaurant_searches():
     
     url = "https://www.tripadvisor.com/data/graphql/ids"
     
-    async with httpx.AsyncClient(http2=True, headers=headers, timeout=httpx.Timeout(30.0)) as client:
+    # Try different location type combinations
+    location_type_sets = [
+        # Restaurants only
+        ["EATERY", "RESTAURANT"],
+        # Restaurants + attractions
+        ["EATERY", "RESTAURANT", "ATTRACTION"],
+        # All types
+        ["GEO", "AIRPORT", "ACCOMMODATION", "ATTRACTION", "EATERY", "RESTAURANT", "NEIGHBORHOOD"],
+        # Minimal
+        ["EATERY"]
+    ]
+    
+    # The sets overlap, so ask once per term for their union and filter
+    # locally for each set; over-fetch a little to cover the filtering
+    all_location_types = list(dict.fromkeys(t for types in location_type_sets for t in types))
+    
+    def build_payload(search_term):
+        return [{
+            "variables": {
+                "request": {
+                    "query": search_term,
+                    "limit": 10,
+                    "scope": "WORLDWIDE",
+                    "locale": "en-US",
+                    "scopeGeoId": 1,
+                    "searchCenter": None,
+                    "types": ["LOCATION"],
+                    "locationTypes": all_location_types,
+                    "userId": None,
+                    "context": {},
+                    "enabledFeatures": ["articles"],
+                    "includeRecent": True
+                }
+            },
+            "query": query_id,
+            "extensions": {"preRegisteredQueryId": query_id}
+        }]
+    
+    limiter = AIMDLimiter(max_concurrency=8)
+    
+    client = get_client()
+    
+    async def run_one(search_term):
+        return await limiter.run_with_retry(
+            lambda: client.post(url, content=orjson.dumps(build_payload(search_term)), headers=headers)
+        )
+    
+    responses = await asyncio.gather(
+        *[run_one(term) for term in test_searches], return_exceptions=True
+    )
+    
+    # One stdout write per search term instead of a print per line
+    for search_term, response in zip(test_searches, responses):
+        lines = []
+        lines.append(f"\n{'='*60}")
+        lines.append(f"🔍 SEARCHING FOR: {search_term}")
+        lines.append(f"{'='*60}")
         
-        for search_term in test_searches:
-            print(f"\n{'='*60}")
-            print(f"🔍 SEARCHING FOR: {search_term}")
-            print(f"{'='*60}")
+        all_results, failure = None, None
+        try:
+            if isinstance(response, Exception):
+                raise response
             
-            # Try different location type combinations
-            location_type_sets = [
-                # Restaurants only
-                ["EATERY", "RESTAURANT"],
-                # Restaurants + attractions
-                ["EATERY", "RESTAURANT", "ATTRACTION"],
-                # All types
-                ["GEO", "AIRPORT", "ACCOMMODATION", "ATTRACTION", "EATERY", "RESTAURANT", "NEIGHBORHOOD"],
-                # Minimal
-                ["EATERY"]
-            ]
+            if response.status_code == 200:
+                data = orjson.loads(response.content)
+                
+                if isinstance(data, list) and len(data) > 0:
+                    autocomplete_data = data[0].get("data", {}).get("Typeahead_autocomplete", {})
+                    all_results = autocomplete_data.get("results", [])
+            else:
+                failure = f"❌ Status {response.status_code}"
+                
+        except Exception as e:
+            failure = f"❌ Error: {e}"
+        
+        for i, location_types in enumerate(location_type_sets, 1):
+            lines.append(f"\n--- Test {i}: Location types {location_types} ---")
+            
+            if failure:
+                lines.append(failure)
+            if all_results is None:
+                continue
+            
+            wanted = set(location_types)
+            results = [
+                result for result in all_results
+                if result.get("details", {}).get("placeType") in wanted
+            ][:5]
             
-            for i, location_types in enumerate(location_type_sets, 1):
-                print(f"\n--- Test {i}: Location types {location_types} ---")
+            lines.append(f"📊 Found {len(results)} results:")
+            
+            for j, result in enumerate(results, 1):
+                name = result.get("text", "Unknown")
+                details = result.get("details", {})
+                place_type = details.get("placeType", "Unknown")
+                url_path = details.get("url", "")
                 
-                payload = [{
-                    "variables": {
-                        "request": {
-                            "query": search_term,
-                            "limit": 5,
-                            "scope": "WORLDWIDE",
-                            "locale": "en-US",
-                            "scopeGeoId": 1,
-                            "searchCenter": None,
-                            "types": ["LOCATION"],
-                            "locationTypes": location_types,
-                            "userId": None,
-                            "context": {},
-                            "enabledFeatures": ["articles"],
-                            "includeRecent": True
-                        }
-                    },
-                    "query": query_id,
-                    "extensions": {"preRegisteredQueryId": query_id}
-                }]
+                lines.append(f"   {j}. {name} ({place_type})")
                 
-                try:
-                    response = await client.post(url, json=payload)
+                if url_path:
+                    lines.append(f"      🔗 {url_path[:60]}...")
                     
-                    if response.status_code == 200:
-                        data = response.json()
-                        
-                        if isinstance(data, list) and len(data) > 0:
-                            autocomplete_data = data[0].get("data", {}).get("Typeahead_autocomplete", {})
-                            results = autocomplete_data.get("results", [])
-                            
-                            print(f"📊 Found {len(results)} results:")
-                            
-                            for j, result in enumerate(results, 1):
-                                name = result.get("text", "Unknown")
-                                details = result.get("details", {})
-                                place_type = details.get("placeType", "Unknown")
-                                url_path = details.get("url", "")
-                                
-                                print(f"   {j}. {name} ({place_type})")
-                                
-                                if url_path:
-                                    print(f"      🔗 {url_path[:60]}...")
-                                    
-                                    # Check what type of URL this is
-                                    if "Restaurant_Review" in url_path:
-                                        print(f"      🍽️ *** RESTAURANT URL ***")
-                                    elif "Attraction_Review" in url_path:
-                                        print(f"      🎯 Attraction URL")
-                                    elif "Hotel_Review" in url_path:
-                                        print(f"      🏨 Hotel URL")
-                                
-                                coords = result.get("coordinates", {})
-                                if coords.get("lat"):
-                                    print(f"      📍 Coordinates: {coords.get('lat')}, {coords.get('lng')}")
-                                
-                                print()
-                    else:
-                        print(f"❌ Status {response.status_code}")
-                        
-                except Exception as e:
-                    print(f"❌ Error: {e}")
+                    # Check what type of URL this is
+                    kind = _URL_KIND_RE.search(url_path)
+                    if kind:
+                        lines.append(_URL_KIND_LABELS[kind.group("kind")])
                 
-                await asyncio.sleep(1)
-            
-            await asyncio.sleep(2)  # Between search terms
+                coords = result.get("coordinates", {})
+                if coords.get("lat"):
+                    lines.append(f"      📍 Coordinates: {coords.get('lat')}, {coords.get('lng')}")
+                
+                lines.append("")
+        
+        sys.stdout.write("\n".join(lines) + "\n")
+
+async def main():
+    try:
+        await debug_restaurant_searches()
+    finally:
+        await close_client()
 
 if __name__ == "__main__":
-    asyncio.run(debug_restaurant_searches())
\ No newline at end of file
+    asyncio.run(main())
\ No newline at end of file
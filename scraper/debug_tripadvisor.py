@@ -5,26 +5,26 @@ Debug script to see what TripAdvisor's API is actually returning
 
 import asyncio
 import json
-import httpx
+import orjson
+import os
 from loguru import logger as log
+from http_client import close_client, get_client
+from rate_limiter import AIMDLimiter
+
+DEBUG_DUMP = os.environ.get("TA_DEBUG_DUMP") == "1"
 
 async def debug_tripadvisor_response():
     """Debug what TripAdvisor API is returning for location search"""
     
-    # Same headers as the scraper
+    # Same headers as the scraper; User-Agent, Accept-Language and
+    # Accept-Encoding come from the shared client
     base_headers = {
         "authority": "www.tripadvisor.com",
-        "accept-language": "en-US,en;q=0.9",
-        "user-agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/96.0.4664.110 Safari/537.36",
         "accept": "text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,image/apng,*/*;q=0.8",
-        "accept-encoding": "gzip, deflate, br",
     }
     
-    client = httpx.AsyncClient(
-        http2=True,
-        headers=base_headers,
-        timeout=httpx.Timeout(30.0)
-    )
+    client = get_client()
+    limiter = AIMDLimiter(max_concurrency=1)
     
     # Test queries
     test_queries = ["Dallas", "Dallas Texas", "Dallas, Texas", "Malta"]
@@ -66,25 +66,30 @@ async def debug_tripadvisor_response():
             ]
             
             headers = {
+                **base_headers,
                 "X-Requested-By": "a" * 180,  # Random request ID
                 "Referer": "https://www.tripadvisor.com/Hotels",
                 "Origin": "https://www.tripadvisor.com",
+                "Content-Type": "application/json",
             }
             
-            result = await client.post(
+            result = await limiter.run_with_retry(lambda: client.post(
                 url="https://www.tripadvisor.com/data/graphql/ids",
-                json=payload,
+                content=orjson.dumps(payload),
                 headers=headers,
-            )
+            ))
             
             print(f"Status Code: {result.status_code}")
             print(f"Response headers: {dict(result.headers)}")
             
             if result.status_code == 200:
                 try:
-                    data = json.loads(result.content)
-                    print(f"Response structure:")
-                    print(json.dumps(data, indent=2)[:1000] + "..." if len(str(data)) > 1000 else json.dumps(data, indent=2))
+                    data = orjson.loads(result.content)
+                    # Dumping the whole response is opt-in: TA_DEBUG_DUMP=1
+                    if DEBUG_DUMP:
+                        print(f"Response structure:")
+                        preview = orjson.dumps(data)[:1000].decode(errors="replace")
+                        print(preview + "..." if len(result.content) > 1000 else preview)
                     
                     # Try to navigate the structure
                     if isinstance(data, list) and len(data) > 0:
@@ -124,8 +129,12 @@ async def debug_tripadvisor_response():
                 
         except Exception as e:
             print(f"Error: {e}")
-    
-    await client.aclose()
+
+async def main():
+    try:
+        await debug_tripadvisor_response()
+    finally:
+        await close_client()
 
 if __name__ == "__main__":
-    asyncio.run(debug_tripadvisor_response())
\ No newline at end of file
+    asyncio.run(main())
\ No newline at end of file
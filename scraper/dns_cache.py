@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+"""
+DNS-caching transport for httpx
+
+httpx looks a host up again for every new connection. This transport
+resolves each hostname once per TTL and connects to the cached address.
+Only the TCP connect sees the address: URLs, the connection pool key, TLS
+SNI and certificate checks all keep the hostname, so a connection is
+never reused for another host that happens to share its IP.
+"""
+
+import asyncio
+import ipaddress
+import socket
+import time
+from typing import Dict, Tuple
+
+import httpcore
+import httpx
+
+def _is_ip(host: str) -> bool:
+    try:
+        ipaddress.ip_address(host)
+    except ValueError:
+        return False
+    return True
+
+class CachingResolverBackend(httpcore.AsyncNetworkBackend):
+    """httpcore network backend that connects to cached addresses"""
+
+    def __init__(self, ttl: float = 300, backend: httpcore.AsyncNetworkBackend = None):
+        # getaddrinfo doesn't report record TTLs, so entries live for a fixed time
+        self.ttl = ttl
+        self._backend = backend if backend is not None else httpcore.AnyIOBackend()
+        # host -> (expires_at, address)
+        self._addresses: Dict[str, Tuple[float, str]] = {}
+
+    async def resolve(self, host: str) -> str:
+        """First address for host, from cache when fresh"""
+        entry = self._addresses.get(host)
+        if entry is not None and time.monotonic() < entry[0]:
+            return entry[1]
+
+        infos = await asyncio.get_running_loop().getaddrinfo(host, None, type=socket.SOCK_STREAM)
+        address = infos[0][4][0]
+        self._addresses[host] = (time.monotonic() + self.ttl, address)
+        return address
+
+    async def connect_tcp(self, host, port, timeout=None, local_address=None, socket_options=None):
+        if not _is_ip(host):
+            host = await self.resolve(host)
+        return await self._backend.connect_tcp(
+            host, port, timeout=timeout, local_address=local_address, socket_options=socket_options
+        )
+
+    async def connect_unix_socket(self, path, timeout=None, socket_options=None):
+        return await self._backend.connect_unix_socket(path, timeout=timeout, socket_options=socket_options)
+
+    async def sleep(self, seconds: float):
+        await self._backend.sleep(seconds)
+
+class CachingResolverTransport(httpx.AsyncHTTPTransport):
+    def __init__(self, *args, ttl: float = 300, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.resolver = CachingResolverBackend(ttl)
+        # httpx has no network_backend argument; the pool reads this
+        # attribute each time it opens a connection
+        self._pool._network_backend = self.resolver
@@ -0,0 +1,23 @@
+#!/usr/bin/env python3
+"""
+Event loop selection for the scraper entry points
+
+Runs coroutines on uvloop's libuv-backed loop when it's installed, or on
+winloop, its Windows port; otherwise on asyncio's default loop.
+"""
+
+import asyncio
+
+try:
+    import uvloop
+except ImportError:
+    try:
+        import winloop as uvloop
+    except ImportError:
+        uvloop = None
+
+def run(main):
+    """asyncio.run(main) on the fastest available loop"""
+    if uvloop is not None:
+        return uvloop.run(main)
+    return asyncio.run(main)
@@ -5,15 +5,28 @@ Combines GraphQL individual attraction searches with knowledge base
 """
 
 import asyncio
-import json
 import httpx
-import random
-import string
+import orjson
+import re
 import time
-from typing import Dict, List, Optional
+from typing import Dict, List, Optional, Tuple
 from loguru import logger as log
+from http_client import GRAPHQL_HEADERS, graphql_request_headers
+from graphql_cache import GraphQLCache
+from rate_limiter import THROTTLE_STATUSES, AIMDLimiter
+
+# Name segment of attraction and attraction-product URLs
+_REVIEWS_RE = re.compile(r"Reviews-([^-]+)")
+_PRODUCT_RE = re.compile(r"AttractionProductReview-[^-]*-[^-]*-([^-]+)")
+
+# Placeholder for the search text in the pre-encoded payload frames
+_QUERY_SLOT = b'"__QUERY__"'
 
 class FinalIslaVerdeScraper:
+    # Whether the GraphQL endpoint serves the pre-registered query over GET
+    # (None until the first request finds out); shared by all instances
+    persisted_get_supported: Optional[bool] = None
+    
     def __init__(self):
         self.base_url = "https://www.tripadvisor.com"
         self.graphql_url = "https://www.tripadvisor.com/data/graphql/ids"
@@ -37,127 +50,219 @@ class FinalIslaVerdeScraper:
             "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
             "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36"
         ]
+        
+        # Shared HTTP/2 client, opened by __aenter__
+        self._client: Optional[httpx.AsyncClient] = None
+        # Adaptive cap on concurrent searches against the GraphQL endpoint
+        self._limiter = AIMDLimiter(max_concurrency=5)
+        # Held while persisted GET support is unknown, so concurrent
+        # searches wait on one probe instead of each sending their own
+        self._probe_lock = asyncio.Lock()
+        # Parsed Typeahead results keyed on (query, locationTypes)
+        self._cache = GraphQLCache()
+        
+        # Typeahead request skeleton; only the query and locationTypes vary
+        self._typeahead_request = {
+            "query": "__QUERY__",
+            "limit": 5,
+            "scope": "WORLDWIDE",
+            "locale": "en-US",
+            "scopeGeoId": 1,
+            "searchCenter": None,
+            "types": ["LOCATION"],
+            "locationTypes": [],
+            "userId": None,
+            "context": {},
+            "enabledFeatures": ["articles"],
+            "includeRecent": True
+        }
+        self._extensions = {"preRegisteredQueryId": self.query_id}
+        self._extensions_param = orjson.dumps(self._extensions).decode()
+        # locationTypes -> pre-encoded payload frames, see _payload_frames
+        self._frames_by_types: Dict[tuple, tuple] = {}
+    
+    async def __aenter__(self):
+        self._client = httpx.AsyncClient(
+            http2=True,
+            headers=GRAPHQL_HEADERS,
+            timeout=httpx.Timeout(30.0),
+            limits=httpx.Limits(max_keepalive_connections=20, max_connections=100)
+        )
+        return self
     
-    def generate_request_id(self, length=180):
-        return ''.join(random.choices(string.ascii_lowercase + string.digits, k=length))
+    async def __aexit__(self, *exc_info):
+        await self._client.aclose()
+        self._client = None
     
     def get_graphql_headers(self):
-        return {
-            "User-Agent": random.choice(self.user_agents),
-            "Accept": "*/*",
-            "Accept-Language": "en-US,en;q=0.9",
-            "Accept-Encoding": "gzip, deflate, br",
-            "Content-Type": "application/json",
-            "X-Requested-By": self.generate_request_id(),
-            "Referer": "https://www.tripadvisor.com/",
-            "Origin": "https://www.tripadvisor.com",
-            "Connection": "keep-alive",
-            "Sec-Fetch-Dest": "empty",
-            "Sec-Fetch-Mode": "cors",
-            "Sec-Fetch-Site": "same-origin"
-        }
+        return {**GRAPHQL_HEADERS, **graphql_request_headers(self.user_agents)}
     
     def extract_name_from_url(self, url: str) -> str:
         """Extract attraction name from TripAdvisor URL"""
+        # Reviews-Name-Location.html, else a tour/activity URL
+        match = _REVIEWS_RE.search(url) or _PRODUCT_RE.search(url)
+        if not match:
+            return "Unknown Attraction"
+        # Underscores and %20 are spaces; capitalize each word. Not .title(),
+        # which gives "Tony'S" and keeps doubled spaces
+        name = match.group(1).replace("_", " ").replace("%20", " ")
+        return " ".join(word.capitalize() for word in name.split())
+    
+    async def fetch_typeahead_results(self, query: str, location_types: List[str]) -> List[Dict]:
+        """Typeahead_autocomplete results for a query, served from cache when possible"""
+        cached = self._cache.get(query, location_types)
+        if cached is not None:
+            log.info("💾 Cache hit for: {}", query)
+            return cached
+        
+        (body_head, body_tail), (variables_head, variables_tail) = self._payload_frames(location_types)
+        encoded_query = orjson.dumps(query)
+        response, data = await self._send_typeahead(
+            body_head + encoded_query + body_tail,
+            (variables_head + encoded_query + variables_tail).decode()
+        )
+        if not data:
+            return []
+        
+        autocomplete_data = data[0].get("data", {}).get("Typeahead_autocomplete", {})
+        search_results = autocomplete_data.get("results", [])
+        
+        self._cache.put(query, location_types, search_results, response.headers.get("Cache-Control"))
+        return search_results
+    
+    def _parse_batch(self, response: httpx.Response) -> Optional[List]:
+        """GraphQL batch from a response, or None if the query was not served"""
+        if response.status_code != 200:
+            return None
+        
         try:
-            if "Reviews-" in url:
-                # Extract from pattern: Reviews-Name-Location.html
-                name_part = url.split("Reviews-")[1].split("-")[0]
-                # Convert underscores to spaces and clean up
-                name = name_part.replace("_", " ").replace("%20", " ")
-                # Capitalize first letter of each word
-                name = " ".join(word.capitalize() for word in name.split())
-                return name
-            elif "AttractionProductReview" in url:
-                # Extract from tour/activity URLs
-                parts = url.split("-")
-                if len(parts) >= 4:
-                    name_part = parts[3]
-                    name = name_part.replace("_", " ").replace("%20", " ")
-                    return " ".join(word.capitalize() for word in name.split())
-        except Exception as e:
-            log.error(f"Error extracting name from URL {url}: {e}")
+            data = orjson.loads(response.content)
+        except orjson.JSONDecodeError:
+            # e.g. an HTML error page served with 200
+            return None
+        # GET returns a single operation result, POST a batch
+        if isinstance(data, dict):
+            data = [data]
+        if not isinstance(data, list):
+            return None
+        
+        for item in data:
+            if not isinstance(item, dict) or "data" not in item:
+                return None
+            if any("PersistedQueryNotFound" in str(error) for error in item.get("errors") or []):
+                return None
+        
+        return data
+    
+    def _payload_frames(self, location_types: List[str]) -> Tuple[Tuple[bytes, bytes], Tuple[bytes, bytes]]:
+        """Encoded POST body and GET variables, split around the query slot"""
+        key = tuple(location_types)
+        frames = self._frames_by_types.get(key)
+        if frames is None:
+            variables = {"request": {**self._typeahead_request, "locationTypes": list(key)}}
+            body = orjson.dumps([{
+                "variables": variables,
+                "query": self.query_id,
+                "extensions": self._extensions
+            }])
+            frames = (
+                tuple(body.split(_QUERY_SLOT)),
+                tuple(orjson.dumps(variables).split(_QUERY_SLOT))
+            )
+            self._frames_by_types[key] = frames
+        return frames
+    
+    async def _send_typeahead(self, body: bytes, variables: str):
+        """Send the query, preferring a cacheable persisted GET over POST"""
+        cls = FinalIslaVerdeScraper
+        
+        if cls.persisted_get_supported is None:
+            async with self._probe_lock:
+                # Re-check: the probe we waited on may have settled it
+                if cls.persisted_get_supported is not False:
+                    result = await self._send_persisted_get(variables)
+                    if result is not None:
+                        return result
+        elif cls.persisted_get_supported:
+            result = await self._send_persisted_get(variables)
+            if result is not None:
+                return result
         
-        return "Unknown Attraction"
+        # Reuse the pooled connection; only the per-request identity rotates
+        response = await self._limiter.run_with_retry(lambda: self._client.post(
+            self.graphql_url, content=body, headers=graphql_request_headers(self.user_agents)
+        ))
+        return response, self._parse_batch(response)
+    
+    async def _send_persisted_get(self, variables: str):
+        """(response, batch) from a persisted GET, or None to fall back to POST"""
+        cls = FinalIslaVerdeScraper
+        
+        # Only the query id and variables go on the wire; identical
+        # searches get identical, edge-cacheable URLs
+        params = {"variables": variables, "extensions": self._extensions_param}
+        response = await self._limiter.run_with_retry(lambda: self._client.get(
+            self.graphql_url, params=params, headers=graphql_request_headers(self.user_agents)
+        ))
+        
+        data = self._parse_batch(response)
+        if data is not None:
+            cls.persisted_get_supported = True
+            return response, data
+        
+        # Anything but throttling (403 is TripAdvisor's usual answer, or
+        # a 200 that isn't a GraphQL batch) means the endpoint doesn't
+        # do GET: stop probing. Throttles fall through to POST this once
+        if response.status_code not in THROTTLE_STATUSES:
+            if cls.persisted_get_supported is None:
+                log.info("📮 Persisted GET not supported, using POST")
+            cls.persisted_get_supported = False
+        return None
     
     async def search_individual_attraction(self, attraction_name: str) -> List[Dict]:
         """Search for a specific attraction using GraphQL"""
-        log.info(f"🔍 Searching for: {attraction_name}")
-        
-        payload = [{
-            "variables": {
-                "request": {
-                    "query": attraction_name,
-                    "limit": 5,
-                    "scope": "WORLDWIDE",
-                    "locale": "en-US",
-                    "scopeGeoId": 1,
-                    "searchCenter": None,
-                    "types": ["LOCATION"],
-                    "locationTypes": [
-                        "ATTRACTION", "ATTRACTION_PRODUCT", "GEO", "NEIGHBORHOOD"
-                    ],
-                    "userId": None,
-                    "context": {},
-                    "enabledFeatures": ["articles"],
-                    "includeRecent": True
-                }
-            },
-            "query": self.query_id,
-            "extensions": {"preRegisteredQueryId": self.query_id}
-        }]
+        log.info("🔍 Searching for: {}", attraction_name)
         
         results = []
         
         try:
-            async with httpx.AsyncClient(
-                http2=True,
-                headers=self.get_graphql_headers(),
-                timeout=httpx.Timeout(30.0)
-            ) as client:
+            search_results = await self.fetch_typeahead_results(
+                attraction_name, ["ATTRACTION", "ATTRACTION_PRODUCT", "GEO", "NEIGHBORHOOD"]
+            )
+            
+            for result in search_results:
+                details = result.get("details", {})
+                coords = result.get("coordinates", {})
                 
-                response = await client.post(self.graphql_url, json=payload)
+                # Focus on attractions
+                place_type = details.get("placeType", "")
+                url = details.get("url", "")
                 
-                if response.status_code == 200:
-                    data = response.json()
+                if place_type == "ATTRACTION" or "Attraction" in url:
+                    # Extract name from URL if text is null
+                    name = result.get("text", "")
+                    if not name or name == "Unknown":
+                        name = self.extract_name_from_url(url)
                     
-                    if isinstance(data, list) and len(data) > 0:
-                        autocomplete_data = data[0].get("data", {}).get("Typeahead_autocomplete", {})
-                        search_results = autocomplete_data.get("results", [])
-                        
-                        for result in search_results:
-                            details = result.get("details", {})
-                            coords = result.get("coordinates", {})
-                            
-                            # Focus on attractions
-                            place_type = details.get("placeType", "")
-                            url = details.get("url", "")
-                            
-                            if place_type == "ATTRACTION" or "Attraction" in url:
-                                # Extract name from URL if text is null
-                                name = result.get("text", "")
-                                if not name or name == "Unknown":
-                                    name = self.extract_name_from_url(url)
-                                
-                                attraction_data = {
-                                    "name": name,
-                                    "tripadvisor_url": url,
-                                    "location_id": result.get("locationId"),
-                                    "place_type": place_type,
-                                    "coordinates": {
-                                        "lat": coords.get("lat"),
-                                        "lng": coords.get("lng")
-                                    },
-                                    "address": details.get("localizedAdditionalNames", {}).get("longOnlyHierarchy", ""),
-                                    "search_query": attraction_name,
-                                    "scraped_at": time.time()
-                                }
-                                
-                                results.append(attraction_data)
-                                log.info(f"✅ Found attraction: {attraction_data['name']}")
-                
+                    attraction_data = {
+                        "name": name,
+                        "tripadvisor_url": url,
+                        "location_id": result.get("locationId"),
+                        "place_type": place_type,
+                        "coordinates": {
+                            "lat": coords.get("lat"),
+                            "lng": coords.get("lng")
+                        },
+                        "address": details.get("localizedAdditionalNames", {}).get("longOnlyHierarchy", ""),
+                        "search_query": attraction_name,
+                        "scraped_at": time.time()
+                    }
+                    
+                    results.append(attraction_data)
+                    log.info("✅ Found attraction: {}", attraction_data["name"])
+            
         except Exception as e:
-            log.error(f"❌ Error searching for {attraction_name}: {e}")
+            log.opt(exception=True).error("❌ Error searching for {}: {}", attraction_name, e)
         
         return results
     
@@ -167,17 +272,16 @@ class FinalIslaVerdeScraper:
         
         all_attractions = []
         
-        for attraction in self.attractions_to_search:
-            try:
-                results = await self.search_individual_attraction(attraction)
-                all_attractions.extend(results)
-                
-                # Rate limiting
-                await asyncio.sleep(2)
-                
-            except Exception as e:
-                log.error(f"❌ Failed to search {attraction}: {e}")
+        search_results = await asyncio.gather(
+            *[self.search_individual_attraction(attraction) for attraction in self.attractions_to_search],
+            return_exceptions=True
+        )
+        
+        for attraction, results in zip(self.attractions_to_search, search_results):
+            if isinstance(results, Exception):
+                log.opt(exception=results).error("❌ Failed to search {}: {}", attraction, results)
                 continue
+            all_attractions.extend(results)
         
         return all_attractions
     
@@ -286,25 +390,26 @@ class FinalIslaVerdeScraper:
         # Get knowledge base
         knowledge_base = self.get_knowledge_base_attractions()
         
-        # Merge data - prioritize scraped data but include knowledge base
+        # Merge data - prioritize scraped data but include knowledge base.
+        # Both lists are freshly built, so tag them in place.
         final_attractions = []
+        sources = set()
+        scraped_names = set()
         
         # Add scraped attractions
         for attraction in scraped_attractions:
-            final_attractions.append({
-                **attraction,
-                "data_source": "tripadvisor_graphql"
-            })
+            attraction["data_source"] = "tripadvisor_graphql"
+            final_attractions.append(attraction)
+            scraped_names.add(attraction['name'].lower())
+        if scraped_attractions:
+            sources.add("tripadvisor_graphql")
         
         # Add knowledge base attractions (avoid duplicates)
-        scraped_names = {attr['name'].lower() for attr in scraped_attractions}
-        
         for attraction in knowledge_base:
             if attraction['name'].lower() not in scraped_names:
-                final_attractions.append({
-                    **attraction,
-                    "data_source": "knowledge_base"
-                })
+                attraction["data_source"] = "knowledge_base"
+                final_attractions.append(attraction)
+                sources.add("knowledge_base")
         
         return {
             "destination": "Isla Verde & Puerto Rico",
@@ -318,7 +423,7 @@ class FinalIslaVerdeScraper:
                 "graphql_successful": len(scraped_attractions) > 0,
                 "query_id_used": self.query_id,
                 "knowledge_base_used": True,
-                "total_sources": len(set(attr.get('data_source', 'unknown') for attr in final_attractions))
+                "total_sources": len(sources)
             },
             "scraped_at": time.time(),
             "last_updated": "2025-08-13"
@@ -326,16 +431,17 @@ class FinalIslaVerdeScraper:
 
 async def main():
     """Run the final comprehensive scraper"""
-    scraper = FinalIslaVerdeScraper()
-    
     try:
         # Create comprehensive guide
-        guide = await scraper.create_final_guide()
+        async with FinalIslaVerdeScraper() as scraper:
+            guide = await scraper.create_final_guide()
         
         # Save results
         filename = f"isla_verde_final_comprehensive_{int(time.time())}.json"
-        with open(filename, 'w', encoding='utf-8') as f:
-            json.dump(guide, f, indent=2, ensure_ascii=False)
+        # orjson already emits UTF-8 bytes; write them straight through
+        # rather than decoding into a second full-size str
+        with open(filename, 'wb', buffering=1 << 20) as f:
+            f.write(orjson.dumps(guide, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS))
         
         # Print summary
         print(f"\n🏖️ FINAL ISLA VERDE COMPREHENSIVE GUIDE")
@@ -367,7 +473,7 @@ async def main():
         return guide
         
     except Exception as e:
-        log.error(f"❌ Main execution failed: {e}")
+        log.opt(exception=True).error("❌ Main execution failed: {}", e)
         return None
 
 if __name__ == "__main__":
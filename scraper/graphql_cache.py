@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+"""
+In-process LRU + TTL cache for TripAdvisor Typeahead_autocomplete results
+
+Keyed on (query, locationTypes) so identical GraphQL searches within a run
+are answered without going back to the wire.
+"""
+
+import hashlib
+import json
+import re
+import time
+from collections import OrderedDict
+from typing import Iterable, List, Optional
+
+_MAX_AGE_RE = re.compile(r'max-age=(\d+)')
+
+class GraphQLCache:
+    def __init__(self, maxsize: int = 256, ttl: float = 300):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        # key -> (expires_at, results), oldest first
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+
+    @staticmethod
+    def key(query: str, location_types: Iterable[str]) -> str:
+        raw = json.dumps({"q": query, "lt": sorted(location_types)}, sort_keys=True)
+        return hashlib.sha256(raw.encode()).hexdigest()
+
+    def get(self, query: str, location_types: Iterable[str]) -> Optional[List]:
+        """Cached results, or None on a miss or expired entry"""
+        key = self.key(query, location_types)
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+
+        expires_at, results = entry
+        if time.monotonic() >= expires_at:
+            del self._entries[key]
+            return None
+
+        self._entries.move_to_end(key)
+        return results
+
+    def put(self, query: str, location_types: Iterable[str], results: List,
+            cache_control: Optional[str] = None):
+        """Store results, honoring the response's Cache-Control if given"""
+        ttl = self.ttl
+        if cache_control:
+            if "no-store" in cache_control or "no-cache" in cache_control:
+                return
+            max_age = _MAX_AGE_RE.search(cache_control)
+            if max_age:
+                ttl = int(max_age.group(1))
+        if ttl <= 0:
+            return
+
+        key = self.key(query, location_types)
+        self._entries[key] = (time.monotonic() + ttl, results)
+        self._entries.move_to_end(key)
+
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
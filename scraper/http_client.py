@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""
+Shared HTTP/2 client for the TripAdvisor debug scripts
+
+One pooled AsyncClient per process, so scripts run back-to-back on the
+same event loop reuse warm keep-alive connections instead of each paying
+for its own TLS handshakes. It is bound to the loop that first uses it:
+call close_client() before switching loops.
+"""
+
+import base64
+import os
+import random
+from typing import Dict, Optional, Sequence
+
+import httpx
+
+# httpx only decodes br when a Brotli binding is installed (httpx[brotli]
+# in requirements.txt); don't advertise an encoding we can't read
+try:
+    import brotli  # noqa: F401
+    ACCEPT_ENCODING = "gzip, deflate, br"
+except ImportError:
+    try:
+        import brotlicffi  # noqa: F401
+        ACCEPT_ENCODING = "gzip, deflate, br"
+    except ImportError:
+        ACCEPT_ENCODING = "gzip, deflate"
+
+DEFAULT_HEADERS = {
+    "User-Agent": "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
+    "Accept-Language": "en-US,en;q=0.9",
+    "Accept-Encoding": ACCEPT_ENCODING,
+}
+
+# TripAdvisor GraphQL headers that never change; User-Agent and
+# X-Requested-By rotate per request, see graphql_request_headers
+GRAPHQL_HEADERS = {
+    "Accept": "*/*",
+    "Accept-Language": "en-US,en;q=0.9",
+    "Accept-Encoding": ACCEPT_ENCODING,
+    "Content-Type": "application/json",
+    "Referer": "https://www.tripadvisor.com/",
+    "Origin": "https://www.tripadvisor.com",
+    "Connection": "keep-alive",
+    "Sec-Fetch-Dest": "empty",
+    "Sec-Fetch-Mode": "cors",
+    "Sec-Fetch-Site": "same-origin"
+}
+
+LIMITS = httpx.Limits(max_keepalive_connections=50, max_connections=100, keepalive_expiry=30)
+
+_client: Optional[httpx.AsyncClient] = None
+
+def request_id(length: int = 180) -> str:
+    """Random X-Requested-By value, as the TripAdvisor web client sends"""
+    # base32 of random bytes: 5 bits per char, lowercased to [a-z2-7]
+    return base64.b32encode(os.urandom(length * 5 // 8 + 1)).decode('ascii').lower()[:length]
+
+def graphql_request_headers(user_agents: Sequence[str]) -> Dict[str, str]:
+    """Per-request identity; set GRAPHQL_HEADERS on the client for the rest"""
+    return {
+        "User-Agent": random.choice(user_agents),
+        "X-Requested-By": request_id()
+    }
+
+def get_client() -> httpx.AsyncClient:
+    """The shared client, created on first use"""
+    global _client
+    if _client is None or _client.is_closed:
+        _client = httpx.AsyncClient(
+            http2=True,
+            headers=DEFAULT_HEADERS,
+            timeout=httpx.Timeout(30.0),
+            limits=LIMITS
+        )
+    return _client
+
+async def close_client():
+    """Close the shared client; call once, from the loop that used it"""
+    global _client
+    if _client is not None:
+        await _client.aclose()
+        _client = None
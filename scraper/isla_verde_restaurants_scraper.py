@@ -5,13 +5,180 @@ Scrapes restaurants from TripAdvisor using the same GraphQL techniques
 """
 
 import asyncio
-import json
+import functools
 import httpx
-import random
-import string
+import orjson
+import re
+import threading
 import time
+from collections import defaultdict
+from dataclasses import dataclass
 from typing import Dict, List, Optional
 from loguru import logger as log
+from http_client import GRAPHQL_HEADERS, graphql_request_headers
+from rate_limiter import AIMDLimiter
+
+try:
+    import simdjson
+except ImportError:
+    simdjson = None
+
+# Name segment of restaurant review URLs
+_NAME_RE = re.compile(r"Reviews-([^-]+)")
+_UNDERSCORE_TO_SPACE = str.maketrans({"_": " "})
+# Results kept as restaurants: eatery place types, else a restaurant review URL
+_EATERY_PLACE_TYPES = frozenset({"EATERY"})
+_EATERY_URL_MARKER = "/Restaurant_Review-"
+# Responses at least this large are parsed on the default executor
+_EXECUTOR_PARSE_BYTES = 32 * 1024
+
+@dataclass(slots=True)
+class Restaurant:
+    """Restaurant found by a TripAdvisor Typeahead search"""
+    name: str
+    tripadvisor_url: str
+    location_id: Optional[int]
+    place_type: str
+    lat: Optional[float]
+    lng: Optional[float]
+    address: str
+    search_query: str
+    scraped_at: float
+    data_source: Optional[str] = None
+    
+    def to_dict(self) -> Dict:
+        """Guide record, in the same shape as the knowledge base entries"""
+        record = {
+            "name": self.name,
+            "tripadvisor_url": self.tripadvisor_url,
+            "location_id": self.location_id,
+            "place_type": self.place_type,
+            "coordinates": {"lat": self.lat, "lng": self.lng},
+            "address": self.address,
+            "search_query": self.search_query,
+            "scraped_at": self.scraped_at
+        }
+        if self.data_source is not None:
+            record["data_source"] = self.data_source
+        return record
+
+def area_of(restaurant: Dict) -> str:
+    """Neighborhood to file a restaurant under; blank values count as unknown"""
+    return restaurant.get('neighborhood') or restaurant.get('address') or 'Unknown Area'
+
+# Puerto Rico restaurant knowledge base, built once at import
+_KNOWLEDGE_BASE = (
+    {
+        "name": "Marmalade Restaurant & Wine Bar",
+        "description": "Upscale contemporary restaurant in Old San Juan featuring creative Puerto Rican cuisine with international influences. Known for tasting menus and wine pairings.",
+        "coordinates": {"lat": 18.4659, "lng": -66.1064},
+        "categories": ["fine_dining", "contemporary", "wine_bar"],
+        "cuisine": "Contemporary Puerto Rican",
+        "price_range": "$$$",
+        "rating": 4.5,
+        "estimated_reviews": 1200,
+        "neighborhood": "Old San Juan"
+    },
+    {
+        "name": "Jose Enrique",
+        "description": "Renowned local chef's restaurant serving elevated Puerto Rican comfort food. No reservations, cash only, frequently packed with locals and food enthusiasts.",
+        "coordinates": {"lat": 18.4519, "lng": -66.0621},
+        "categories": ["local_favorite", "puerto_rican", "comfort_food"],
+        "cuisine": "Puerto Rican",
+        "price_range": "$$",
+        "rating": 4.7,
+        "estimated_reviews": 890,
+        "neighborhood": "Santurce"
+    },
+    {
+        "name": "Koko",
+        "description": "Modern Asian-Puerto Rican fusion restaurant with creative cocktails and innovative dishes. Popular for both dinner and weekend brunch.",
+        "coordinates": {"lat": 18.4598, "lng": -66.0711},
+        "categories": ["fusion", "asian", "cocktails", "brunch"],
+        "cuisine": "Asian-Caribbean Fusion",
+        "price_range": "$$$",
+        "rating": 4.4,
+        "estimated_reviews": 650,
+        "neighborhood": "Condado"
+    },
+    {
+        "name": "Santaella",
+        "description": "Modern Puerto Rican restaurant in a beautifully restored building. Offers contemporary interpretations of traditional dishes with emphasis on local ingredients.",
+        "coordinates": {"lat": 18.4532, "lng": -66.0634},
+        "categories": ["modern_puerto_rican", "local_ingredients", "historic_building"],
+        "cuisine": "Modern Puerto Rican",
+        "price_range": "$$$",
+        "rating": 4.6,
+        "estimated_reviews": 1100,
+        "neighborhood": "Santurce"
+    },
+    {
+        "name": "La Placita de Santurce",
+        "description": "Vibrant nightlife area with numerous bars and restaurants. Traditional Puerto Rican food, live music, and local atmosphere especially lively on weekends.",
+        "coordinates": {"lat": 18.4521, "lng": -66.0625},
+        "categories": ["nightlife", "traditional", "live_music", "local_scene"],
+        "cuisine": "Puerto Rican",
+        "price_range": "$-$$",
+        "rating": 4.3,
+        "estimated_reviews": 2100,
+        "neighborhood": "Santurce"
+    },
+    {
+        "name": "Piñones Food Kioskos",
+        "description": "Beachside collection of food stands serving traditional Puerto Rican fried foods. Famous for alcapurrias, bacalaitos, and fresh seafood right on the beach.",
+        "coordinates": {"lat": 18.4789, "lng": -65.9645},
+        "categories": ["beach_food", "traditional", "fried_food", "seafood"],
+        "cuisine": "Traditional Puerto Rican",
+        "price_range": "$",
+        "rating": 4.5,
+        "estimated_reviews": 1800,
+        "neighborhood": "Piñones"
+    },
+    {
+        "name": "Oceano",
+        "description": "Oceanfront restaurant specializing in fresh seafood and steaks with stunning ocean views. Located in a luxury hotel with upscale atmosphere.",
+        "coordinates": {"lat": 18.4567, "lng": -66.0321},
+        "categories": ["seafood", "steaks", "oceanfront", "upscale"],
+        "cuisine": "International Seafood",
+        "price_range": "$$$$",
+        "rating": 4.3,
+        "estimated_reviews": 750,
+        "neighborhood": "Isla Verde"
+    },
+    {
+        "name": "Barrachina",
+        "description": "Historic restaurant in Old San Juan claiming to be the birthplace of the piña colada. Serves traditional Puerto Rican and Caribbean cuisine.",
+        "coordinates": {"lat": 18.4656, "lng": -66.1058},
+        "categories": ["historic", "pina_colada", "caribbean", "tourist_favorite"],
+        "cuisine": "Puerto Rican & Caribbean",
+        "price_range": "$$",
+        "rating": 4.1,
+        "estimated_reviews": 3200,
+        "neighborhood": "Old San Juan"
+    },
+    {
+        "name": "Lúulo",
+        "description": "Contemporary restaurant focusing on local and sustainable ingredients. Creative menu that changes seasonally, popular with locals and food critics.",
+        "coordinates": {"lat": 18.4534, "lng": -66.0639},
+        "categories": ["contemporary", "sustainable", "local_ingredients", "seasonal"],
+        "cuisine": "Contemporary Puerto Rican",
+        "price_range": "$$$",
+        "rating": 4.6,
+        "estimated_reviews": 420,
+        "neighborhood": "Santurce"
+    },
+    {
+        "name": "El Convento Hotel Restaurant",
+        "description": "Elegant restaurant in a historic converted convent serving refined Puerto Rican and international cuisine with beautiful courtyard seating.",
+        "coordinates": {"lat": 18.4652, "lng": -66.1063},
+        "categories": ["historic_hotel", "refined", "courtyard", "international"],
+        "cuisine": "Puerto Rican & International",
+        "price_range": "$$$",
+        "rating": 4.4,
+        "estimated_reviews": 890,
+        "neighborhood": "Old San Juan"
+    }
+)
 
 class IslaVerdeRestaurantScraper:
     def __init__(self):
@@ -37,50 +204,13 @@ class IslaVerdeRestaurantScraper:
             "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
             "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36"
         ]
-    
-    def generate_request_id(self, length=180):
-        return ''.join(random.choices(string.ascii_lowercase + string.digits, k=length))
-    
-    def get_graphql_headers(self):
-        return {
-            "User-Agent": random.choice(self.user_agents),
-            "Accept": "*/*",
-            "Accept-Language": "en-US,en;q=0.9",
-            "Accept-Encoding": "gzip, deflate, br",
-            "Content-Type": "application/json",
-            "X-Requested-By": self.generate_request_id(),
-            "Referer": "https://www.tripadvisor.com/",
-            "Origin": "https://www.tripadvisor.com",
-            "Connection": "keep-alive",
-            "Sec-Fetch-Dest": "empty",
-            "Sec-Fetch-Mode": "cors",
-            "Sec-Fetch-Site": "same-origin"
-        }
-    
-    def extract_name_from_url(self, url: str) -> str:
-        """Extract restaurant name from TripAdvisor URL"""
-        try:
-            if "Reviews-" in url:
-                # Extract from pattern: Reviews-Name-Location.html
-                name_part = url.split("Reviews-")[1].split("-")[0]
-                # Convert underscores to spaces and clean up
-                name = name_part.replace("_", " ").replace("%20", " ")
-                # Capitalize appropriately 
-                name = " ".join(word.capitalize() for word in name.split())
-                return name
-        except Exception as e:
-            log.error(f"Error extracting name from URL {url}: {e}")
-        
-        return "Unknown Restaurant"
-    
-    async def search_restaurants(self, search_query: str) -> List[Dict]:
-        """Search for restaurants using GraphQL"""
-        log.info(f"🍽️ Searching for: {search_query}")
         
+        # The Typeahead payload only varies in its query: encode it once and
+        # splice each search's JSON-encoded query in between
         payload = [{
             "variables": {
                 "request": {
-                    "query": search_query,
+                    "query": "__QUERY__",
                     "limit": 10,
                     "scope": "WORLDWIDE",
                     "locale": "en-US",
@@ -99,195 +229,161 @@ class IslaVerdeRestaurantScraper:
             "query": self.query_id,
             "extensions": {"preRegisteredQueryId": self.query_id}
         }]
+        self._payload_head, self._payload_tail = orjson.dumps(payload).split(b'"__QUERY__"')
         
-        results = []
+        # Per-thread pysimdjson parsers, created on first use
+        self._json_parsers = threading.local()
         
+        # Shared HTTP/2 client, opened by __aenter__
+        self.client: Optional[httpx.AsyncClient] = None
+        # client.post bound to the GraphQL endpoint; set with the client
+        self._post = None
+        # Adaptive cap on concurrent searches, and at most 2 started a
+        # second: the pacing the old fixed 2s sleep per slot gave
+        self._limiter = AIMDLimiter(max_concurrency=5, min_interval=0.5)
+    
+    async def __aenter__(self):
+        self.client = httpx.AsyncClient(
+            http2=True,
+            headers=GRAPHQL_HEADERS,
+            timeout=httpx.Timeout(30.0),
+            limits=httpx.Limits(max_connections=20, max_keepalive_connections=10, keepalive_expiry=30)
+        )
+        self._post = functools.partial(self.client.post, self.graphql_url)
+        return self
+    
+    async def __aexit__(self, *exc_info):
+        await self.client.aclose()
+        self.client = None
+        self._post = None
+    
+    def get_graphql_headers(self):
+        return {**GRAPHQL_HEADERS, **graphql_request_headers(self.user_agents)}
+    
+    def extract_name_from_url(self, url: str) -> str:
+        """Extract restaurant name from TripAdvisor URL"""
+        # Reviews-Name-Location.html
+        match = _NAME_RE.search(url)
+        if not match:
+            return "Unknown Restaurant"
+        # Underscores and %20 are spaces; capitalize each word. Not .title(),
+        # which gives "Tony'S" and keeps doubled spaces
+        name = match.group(1).translate(_UNDERSCORE_TO_SPACE).replace("%20", " ")
+        return " ".join(word.capitalize() for word in name.split())
+    
+    def _typeahead_results(self, content: bytes):
+        """Typeahead_autocomplete results from a GraphQL batch response"""
+        if simdjson is None:
+            data = orjson.loads(content)
+            if isinstance(data, list) and len(data) > 0:
+                return data[0].get("data", {}).get("Typeahead_autocomplete", {}).get("results", [])
+            return []
+        
+        # Parsers aren't thread-safe and large responses are parsed on the
+        # executor, so each thread reuses its own
+        parser = getattr(self._json_parsers, "parser", None)
+        if parser is None:
+            parser = self._json_parsers.parser = simdjson.Parser()
+        
+        # Lazy simdjson proxies: only the fields a caller reads are turned
+        # into Python objects. They pin the thread's parser, so callers must
+        # be done with them before its next parse.
         try:
-            async with httpx.AsyncClient(
-                http2=True,
-                headers=self.get_graphql_headers(),
-                timeout=httpx.Timeout(30.0)
-            ) as client:
-                
-                response = await client.post(self.graphql_url, json=payload)
+            results = parser.parse(content).at_pointer("/0/data/Typeahead_autocomplete/results")
+        except (LookupError, ValueError, TypeError):
+            return []
+        return results or []
+    
+    def _parse_restaurants(self, content: bytes, search_query: str, scraped_at: float) -> List[Restaurant]:
+        """Restaurant records from a Typeahead response body"""
+        results = []
+        for result in self._typeahead_results(content):
+            details = result.get("details", {})
+            coords = result.get("coordinates", {})
+            
+            # Focus on restaurants/eateries
+            place_type = details.get("placeType", "")
+            url = details.get("url", "")
+            
+            if place_type in _EATERY_PLACE_TYPES or _EATERY_URL_MARKER in url:
+                # Extract name from URL if text is null
+                name = result.get("text", "")
+                if not name or name == "Unknown":
+                    name = self.extract_name_from_url(url)
                 
-                if response.status_code == 200:
-                    data = response.json()
-                    
-                    if isinstance(data, list) and len(data) > 0:
-                        autocomplete_data = data[0].get("data", {}).get("Typeahead_autocomplete", {})
-                        search_results = autocomplete_data.get("results", [])
-                        
-                        for result in search_results:
-                            details = result.get("details", {})
-                            coords = result.get("coordinates", {})
-                            
-                            # Focus on restaurants/eateries
-                            place_type = details.get("placeType", "")
-                            url = details.get("url", "")
-                            
-                            if place_type == "EATERY" or "Restaurant_Review" in url:
-                                # Extract name from URL if text is null
-                                name = result.get("text", "")
-                                if not name or name == "Unknown":
-                                    name = self.extract_name_from_url(url)
-                                
-                                restaurant_data = {
-                                    "name": name,
-                                    "tripadvisor_url": url,
-                                    "location_id": result.get("locationId"),
-                                    "place_type": place_type,
-                                    "coordinates": {
-                                        "lat": coords.get("lat"),
-                                        "lng": coords.get("lng")
-                                    },
-                                    "address": details.get("localizedAdditionalNames", {}).get("longOnlyHierarchy", ""),
-                                    "search_query": search_query,
-                                    "scraped_at": time.time()
-                                }
-                                
-                                results.append(restaurant_data)
-                                log.info(f"✅ Found restaurant: {restaurant_data['name']}")
+                restaurant = Restaurant(
+                    name=name,
+                    tripadvisor_url=url,
+                    location_id=result.get("locationId"),
+                    place_type=place_type,
+                    lat=coords.get("lat"),
+                    lng=coords.get("lng"),
+                    address=details.get("localizedAdditionalNames", {}).get("longOnlyHierarchy", ""),
+                    search_query=search_query,
+                    scraped_at=scraped_at
+                )
                 
+                results.append(restaurant)
+                log.info("✅ Found restaurant: {}", restaurant.name)
+        
+        return results
+    
+    async def search_restaurants(self, search_query: str, scraped_at: Optional[float] = None) -> List[Restaurant]:
+        """Search for restaurants using GraphQL"""
+        log.info("🍽️ Searching for: {}", search_query)
+        
+        body = self._payload_head + orjson.dumps(search_query) + self._payload_tail
+        if scraped_at is None:
+            scraped_at = time.time()
+        
+        results = []
+        
+        try:
+            response = await self._limiter.run_with_retry(
+                lambda: self._post(content=body, headers=graphql_request_headers(self.user_agents))
+            )
+            
+            if response.status_code == 200:
+                content = response.content
+                # Large bodies are parsed off the event loop so other searches
+                # keep moving; small ones aren't worth the executor hop
+                if len(content) >= _EXECUTOR_PARSE_BYTES:
+                    results = await asyncio.get_running_loop().run_in_executor(
+                        None, self._parse_restaurants, content, search_query, scraped_at
+                    )
+                else:
+                    results = self._parse_restaurants(content, search_query, scraped_at)
+        
         except Exception as e:
-            log.error(f"❌ Error searching for {search_query}: {e}")
+            log.error("❌ Error searching for {}: {}", search_query, e)
         
         return results
     
-    async def scrape_all_restaurants(self) -> List[Dict]:
+    async def scrape_all_restaurants(self) -> List[Restaurant]:
         """Search for all restaurants"""
         log.info("🍽️ Starting comprehensive restaurant search")
         
         all_restaurants = []
+        # One timestamp for the whole batch
+        now = time.time()
         
-        for search_query in self.restaurant_searches:
-            try:
-                results = await self.search_restaurants(search_query)
-                all_restaurants.extend(results)
-                
-                # Rate limiting
-                await asyncio.sleep(2)
-                
-            except Exception as e:
-                log.error(f"❌ Failed to search {search_query}: {e}")
+        search_results = await asyncio.gather(
+            *[self.search_restaurants(search_query, scraped_at=now) for search_query in self.restaurant_searches],
+            return_exceptions=True
+        )
+        
+        for search_query, results in zip(self.restaurant_searches, search_results):
+            if isinstance(results, Exception):
+                log.error("❌ Failed to search {}: {}", search_query, results)
                 continue
+            all_restaurants.extend(results)
         
         return all_restaurants
     
     def get_knowledge_base_restaurants(self) -> List[Dict]:
         """Puerto Rico restaurant knowledge base"""
-        return [
-            {
-                "name": "Marmalade Restaurant & Wine Bar",
-                "description": "Upscale contemporary restaurant in Old San Juan featuring creative Puerto Rican cuisine with international influences. Known for tasting menus and wine pairings.",
-                "coordinates": {"lat": 18.4659, "lng": -66.1064},
-                "categories": ["fine_dining", "contemporary", "wine_bar"],
-                "cuisine": "Contemporary Puerto Rican",
-                "price_range": "$$$",
-                "rating": 4.5,
-                "estimated_reviews": 1200,
-                "neighborhood": "Old San Juan"
-            },
-            {
-                "name": "Jose Enrique",
-                "description": "Renowned local chef's restaurant serving elevated Puerto Rican comfort food. No reservations, cash only, frequently packed with locals and food enthusiasts.",
-                "coordinates": {"lat": 18.4519, "lng": -66.0621},
-                "categories": ["local_favorite", "puerto_rican", "comfort_food"],
-                "cuisine": "Puerto Rican",
-                "price_range": "$$",
-                "rating": 4.7,
-                "estimated_reviews": 890,
-                "neighborhood": "Santurce"
-            },
-            {
-                "name": "Koko",
-                "description": "Modern Asian-Puerto Rican fusion restaurant with creative cocktails and innovative dishes. Popular for both dinner and weekend brunch.",
-                "coordinates": {"lat": 18.4598, "lng": -66.0711},
-                "categories": ["fusion", "asian", "cocktails", "brunch"],
-                "cuisine": "Asian-Caribbean Fusion",
-                "price_range": "$$$",
-                "rating": 4.4,
-                "estimated_reviews": 650,
-                "neighborhood": "Condado"
-            },
-            {
-                "name": "Santaella",
-                "description": "Modern Puerto Rican restaurant in a beautifully restored building. Offers contemporary interpretations of traditional dishes with emphasis on local ingredients.",
-                "coordinates": {"lat": 18.4532, "lng": -66.0634},
-                "categories": ["modern_puerto_rican", "local_ingredients", "historic_building"],
-                "cuisine": "Modern Puerto Rican",
-                "price_range": "$$$",
-                "rating": 4.6,
-                "estimated_reviews": 1100,
-                "neighborhood": "Santurce"
-            },
-            {
-                "name": "La Placita de Santurce",
-                "description": "Vibrant nightlife area with numerous bars and restaurants. Traditional Puerto Rican food, live music, and local atmosphere especially lively on weekends.",
-                "coordinates": {"lat": 18.4521, "lng": -66.0625},
-                "categories": ["nightlife", "traditional", "live_music", "local_scene"],
-                "cuisine": "Puerto Rican",
-                "price_range": "$-$$",
-                "rating": 4.3,
-                "estimated_reviews": 2100,
-                "neighborhood": "Santurce"
-            },
-            {
-                "name": "Piñones Food Kioskos",
-                "description": "Beachside collection of food stands serving traditional Puerto Rican fried foods. Famous for alcapurrias, bacalaitos, and fresh seafood right on the beach.",
-                "coordinates": {"lat": 18.4789, "lng": -65.9645},
-                "categories": ["beach_food", "traditional", "fried_food", "seafood"],
-                "cuisine": "Traditional Puerto Rican",
-                "price_range": "$",
-                "rating": 4.5,
-                "estimated_reviews": 1800,
-                "neighborhood": "Piñones"
-            },
-            {
-                "name": "Oceano",
-                "description": "Oceanfront restaurant specializing in fresh seafood and steaks with stunning ocean views. Located in a luxury hotel with upscale atmosphere.",
-                "coordinates": {"lat": 18.4567, "lng": -66.0321},
-                "categories": ["seafood", "steaks", "oceanfront", "upscale"],
-                "cuisine": "International Seafood",
-                "price_range": "$$$$",
-                "rating": 4.3,
-                "estimated_reviews": 750,
-                "neighborhood": "Isla Verde"
-            },
-            {
-                "name": "Barrachina",
-                "description": "Historic restaurant in Old San Juan claiming to be the birthplace of the piña colada. Serves traditional Puerto Rican and Caribbean cuisine.",
-                "coordinates": {"lat": 18.4656, "lng": -66.1058},
-                "categories": ["historic", "pina_colada", "caribbean", "tourist_favorite"],
-                "cuisine": "Puerto Rican & Caribbean",
-                "price_range": "$$",
-                "rating": 4.1,
-                "estimated_reviews": 3200,
-                "neighborhood": "Old San Juan"
-            },
-            {
-                "name": "Lúulo",
-                "description": "Contemporary restaurant focusing on local and sustainable ingredients. Creative menu that changes seasonally, popular with locals and food critics.",
-                "coordinates": {"lat": 18.4534, "lng": -66.0639},
-                "categories": ["contemporary", "sustainable", "local_ingredients", "seasonal"],
-                "cuisine": "Contemporary Puerto Rican",
-                "price_range": "$$$",
-                "rating": 4.6,
-                "estimated_reviews": 420,
-                "neighborhood": "Santurce"
-            },
-            {
-                "name": "El Convento Hotel Restaurant",
-                "description": "Elegant restaurant in a historic converted convent serving refined Puerto Rican and international cuisine with beautiful courtyard seating.",
-                "coordinates": {"lat": 18.4652, "lng": -66.1063},
-                "categories": ["historic_hotel", "refined", "courtyard", "international"],
-                "cuisine": "Puerto Rican & International",
-                "price_range": "$$$",
-                "rating": 4.4,
-                "estimated_reviews": 890,
-                "neighborhood": "Old San Juan"
-            }
-        ]
+        # Shallow copies: create_restaurant_guide tags each entry in place
+        return [dict(restaurant) for restaurant in _KNOWLEDGE_BASE]
     
     async def create_restaurant_guide(self) -> Dict:
         """Create comprehensive restaurant guide"""
@@ -299,33 +395,29 @@ class IslaVerdeRestaurantScraper:
         # Get knowledge base
         knowledge_base = self.get_knowledge_base_restaurants()
         
-        # Merge data - avoid duplicates
-        final_restaurants = []
+        # Merge data - avoid duplicates - and organize by neighborhood/area
+        # in the same pass. Both lists are freshly built, so tag in place.
+        # Neighborhoods hold indices into final_restaurants, not copies.
+        # Scraped entries become plain dicts here, the same shape as the
+        # knowledge base ones, so callers never see a Restaurant.
+        final_restaurants: List[Dict] = []
+        neighborhoods: Dict[str, List[int]] = defaultdict(list)
+        scraped_names = frozenset(restaurant.name.casefold() for restaurant in scraped_restaurants)
+        
+        def add(restaurant, area):
+            neighborhoods[area].append(len(final_restaurants))
+            final_restaurants.append(restaurant)
         
         # Add scraped restaurants
         for restaurant in scraped_restaurants:
-            final_restaurants.append({
-                **restaurant,
-                "data_source": "tripadvisor_graphql"
-            })
+            restaurant.data_source = "tripadvisor_graphql"
+            add(restaurant.to_dict(), restaurant.address or 'Unknown Area')
         
         # Add knowledge base restaurants (avoid duplicates)
-        scraped_names = {rest['name'].lower() for rest in scraped_restaurants}
-        
         for restaurant in knowledge_base:
-            if restaurant['name'].lower() not in scraped_names:
-                final_restaurants.append({
-                    **restaurant,
-                    "data_source": "knowledge_base"
-                })
-        
-        # Organize by neighborhood/area
-        neighborhoods = {}
-        for restaurant in final_restaurants:
-            area = restaurant.get('neighborhood', restaurant.get('address', 'Unknown Area'))
-            if area not in neighborhoods:
-                neighborhoods[area] = []
-            neighborhoods[area].append(restaurant)
+            if restaurant['name'].casefold() not in scraped_names:
+                restaurant["data_source"] = "knowledge_base"
+                add(restaurant, area_of(restaurant))
         
         return {
             "destination": "Isla Verde & Puerto Rico",
@@ -336,7 +428,7 @@ class IslaVerdeRestaurantScraper:
             "total_restaurants": len(final_restaurants),
             
             "restaurants": final_restaurants,
-            "by_neighborhood": neighborhoods,
+            "by_neighborhood": dict(neighborhoods),
             
             "dining_highlights": {
                 "fine_dining": ["Marmalade", "Santaella", "Oceano"],
@@ -357,18 +449,37 @@ class IslaVerdeRestaurantScraper:
             "last_updated": "2025-08-13"
         }
 
+def save_guide(guide: Dict, basename: str):
+    """Write the guide as NDJSON restaurant records plus a small summary
+    
+    Records are encoded one per line straight into a buffered file, so
+    the full guide is never pretty-printed as one document. The summary
+    keeps every other field; its by_neighborhood indices are 0-based line
+    numbers in the records file.
+    """
+    records_filename = f"{basename}.ndjson"
+    with open(records_filename, 'wb', buffering=1 << 20) as f:
+        for restaurant in guide["restaurants"]:
+            f.write(orjson.dumps(restaurant, option=orjson.OPT_APPEND_NEWLINE | orjson.OPT_NON_STR_KEYS))
+    
+    summary = {key: value for key, value in guide.items() if key != "restaurants"}
+    summary["restaurants_file"] = records_filename
+    
+    filename = f"{basename}.json"
+    with open(filename, 'wb') as f:
+        f.write(orjson.dumps(summary, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS))
+    
+    return filename, records_filename
+
 async def main():
     """Run the restaurant scraper"""
-    scraper = IslaVerdeRestaurantScraper()
-    
     try:
         # Create restaurant guide
-        guide = await scraper.create_restaurant_guide()
+        async with IslaVerdeRestaurantScraper() as scraper:
+            guide = await scraper.create_restaurant_guide()
         
         # Save results
-        filename = f"isla_verde_restaurants_{int(time.time())}.json"
-        with open(filename, 'w', encoding='utf-8') as f:
-            json.dump(guide, f, indent=2, ensure_ascii=False)
+        filename, records_filename = save_guide(guide, f"isla_verde_restaurants_{int(time.time())}")
         
         # Print summary
         print(f"\n🍽️ ISLA VERDE RESTAURANT GUIDE")
@@ -380,10 +491,11 @@ async def main():
         print(f"🏘️ Neighborhoods covered: {len(guide['by_neighborhood'])}")
         
         print(f"\n🌟 TOP RESTAURANTS BY AREA:")
-        for area, restaurants in guide['by_neighborhood'].items():
-            if restaurants and area != "Unknown Area":
+        for area, indices in guide['by_neighborhood'].items():
+            if indices and area != "Unknown Area":
                 print(f"\n📍 {area}:")
-                for i, restaurant in enumerate(restaurants[:3], 1):
+                for i, index in enumerate(indices[:3], 1):
+                    restaurant = guide['restaurants'][index]
                     name = restaurant.get('name', 'Unknown')
                     cuisine = restaurant.get('cuisine', 'N/A')
                     price = restaurant.get('price_range', 'N/A')
@@ -398,12 +510,13 @@ async def main():
         for dish in guide['dining_highlights']['must_try_dishes']:
             print(f"   • {dish}")
         
-        print(f"\n💾 Complete guide saved to: {filename}")
+        print(f"\n💾 Guide summary saved to: {filename}")
+        print(f"💾 Restaurant records saved to: {records_filename}")
         
         return guide
         
     except Exception as e:
-        log.error(f"❌ Main execution failed: {e}")
+        log.error("❌ Main execution failed: {}", e)
         return None
 
 if __name__ == "__main__":
@@ -6,11 +6,296 @@ Uses multiple user agents and request strategies
 
 import asyncio
 import httpx
-import json
+import itertools
+import orjson
+import os
 import time
 import random
-from typing import Dict, List
+import sys
+from typing import Dict, List, Set
+from urllib.parse import urlparse
 from loguru import logger as log
+from dns_cache import CachingResolverTransport
+from rate_limiter import backoff_delay, retry_after_seconds
+import event_loop
+
+# Browser navigation headers; only the User-Agent varies between requests
+_BASE_HEADERS = {
+    "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8",
+    "Accept-Language": "en-US,en;q=0.5",
+    "Accept-Encoding": "gzip, deflate, br",
+    "Connection": "keep-alive",
+    "Upgrade-Insecure-Requests": "1",
+    "Sec-Fetch-Dest": "document",
+    "Sec-Fetch-Mode": "navigate",
+    "Sec-Fetch-Site": "none",
+    "Cache-Control": "max-age=0"
+}
+
+# Isla Verde / Puerto Rico attractions knowledge base, built once at import.
+# Repeated strings (categories, types, keys) are already shared constants;
+# highlights are tuples since nothing appends to them.
+_ATTRACTIONS = (
+    {
+        "name": "El Yunque National Forest",
+        "description": "The only tropical rainforest in the US National Forest System, featuring waterfalls, hiking trails, and diverse wildlife. Popular trails include La Mina Falls and Mount Britton Tower.",
+        "category": "nature",
+        "type": "national_forest",
+        "rating": 4.6,
+        "coordinates": {"lat": 18.3119, "lng": -65.8031},
+        "address": "El Yunque National Forest, Puerto Rico 00745",
+        "highlights": ("La Mina Falls", "El Yunque Peak", "Yokahú Tower", "Rainforest hiking trails")
+    },
+    {
+        "name": "Balneario de Carolina",
+        "description": "Beautiful public beach in Carolina with calm waters, perfect for families. Features amenities like restrooms, showers, and picnic areas.",
+        "category": "beach",
+        "type": "public_beach", 
+        "rating": 4.3,
+        "coordinates": {"lat": 18.4655, "lng": -66.0004},
+        "address": "Carolina, Puerto Rico",
+        "highlights": ("Family-friendly", "Calm waters", "Public facilities", "Parking available")
+    },
+    {
+        "name": "Isla Verde Beach",
+        "description": "Popular urban beach strip with hotels, restaurants, and water sports. Known for its golden sand and clear blue waters, perfect for swimming and sunbathing.",
+        "category": "beach",
+        "type": "urban_beach",
+        "rating": 4.4,
+        "coordinates": {"lat": 18.4567, "lng": -66.0321},
+        "address": "Isla Verde, Carolina, Puerto Rico",
+        "highlights": ("Water sports", "Beachfront dining", "Hotel zone", "Nightlife nearby")
+    },
+    {
+        "name": "Piñones",
+        "description": "Coastal area known for its kioskos (food stands) serving traditional Puerto Rican food. Great for trying local specialties like alcapurrias and bacalaitos.",
+        "category": "dining",
+        "type": "food_area",
+        "rating": 4.5,
+        "coordinates": {"lat": 18.4789, "lng": -65.9645},
+        "address": "Piñones, Loíza, Puerto Rico", 
+        "highlights": ("Local food kioskos", "Alcapurrias", "Beachside dining", "Traditional cuisine")
+    },
+    {
+        "name": "Laguna Grande",
+        "description": "Bioluminescent lagoon offering magical night kayak tours where the water glows with microscopic organisms called dinoflagellates.",
+        "category": "nature",
+        "type": "bioluminescent_lagoon",
+        "rating": 4.7,
+        "coordinates": {"lat": 18.3847, "lng": -65.8203},
+        "address": "Fajardo, Puerto Rico",
+        "highlights": ("Bioluminescence", "Night kayak tours", "Mangrove forest", "Natural phenomenon")
+    },
+    {
+        "name": "Las Cabezas de San Juan Nature Reserve",
+        "description": "Nature reserve featuring diverse ecosystems including dry forest, mangroves, lagoons, and coral reefs. Home to El Faro lighthouse.",
+        "category": "nature",
+        "type": "nature_reserve", 
+        "rating": 4.6,
+        "coordinates": {"lat": 18.3736, "lng": -65.6242},
+        "address": "Fajardo, Puerto Rico",
+        "highlights": ("El Faro lighthouse", "Diverse ecosystems", "Guided tours", "Coral reefs")
+    },
+    {
+        "name": "Flamenco Beach",
+        "description": "One of the world's most beautiful beaches located on Culebra island. Crystal clear waters and pristine white sand make it a must-visit destination.",
+        "category": "beach", 
+        "type": "pristine_beach",
+        "rating": 4.8,
+        "coordinates": {"lat": 18.3161, "lng": -65.3053},
+        "address": "Culebra, Puerto Rico",
+        "highlights": ("World-class beach", "Crystal clear water", "White sand", "Snorkeling")
+    },
+    {
+        "name": "Condado Beach",
+        "description": "Upscale beach area in San Juan with luxury hotels, fine dining, and shopping. Popular with both locals and tourists for its vibrant atmosphere.",
+        "category": "beach",
+        "type": "urban_beach",
+        "rating": 4.3,
+        "coordinates": {"lat": 18.4655, "lng": -66.0737},
+        "address": "Condado, San Juan, Puerto Rico",
+        "highlights": ("Luxury area", "Fine dining", "Shopping", "Urban beach experience")
+    },
+    {
+        "name": "Casa Bacardí",
+        "description": "Historic rum distillery offering tours and tastings. Learn about the history of Bacardí rum and enjoy samples of their finest products.",
+        "category": "attraction",
+        "type": "distillery",
+        "rating": 4.4,
+        "coordinates": {"lat": 18.4655, "lng": -66.0875},
+        "address": "Cataño, Puerto Rico",
+        "highlights": ("Rum tours", "Tastings", "History museum", "Ferry access")
+    },
+    {
+        "name": "Mosquito Bay",
+        "description": "The brightest bioluminescent bay in the world, located on Vieques island. Best experienced on dark, moonless nights for maximum glow effect.",
+        "category": "nature",
+        "type": "bioluminescent_bay",
+        "rating": 4.9,
+        "coordinates": {"lat": 18.0889, "lng": -65.4736},
+        "address": "Vieques, Puerto Rico", 
+        "highlights": ("Brightest bioluminescent bay", "Night tours", "Natural wonder", "Kayaking")
+    },
+    {
+        "name": "Old San Juan",
+        "description": "Historic colonial district with colorful buildings, cobblestone streets, and centuries-old forts. Rich in history and culture with excellent dining.",
+        "category": "historic",
+        "type": "historic_district",
+        "rating": 4.7,
+        "coordinates": {"lat": 18.4655, "lng": -66.1057},
+        "address": "Old San Juan, Puerto Rico",
+        "highlights": ("Colonial architecture", "Historic forts", "Cobblestone streets", "Cultural sites")
+    },
+    {
+        "name": "Camuy Caves",
+        "description": "One of the world's largest cave systems with underground rivers and impressive limestone formations. Guided tours available through the spectacular caverns.",
+        "category": "nature",
+        "type": "cave_system",
+        "rating": 4.5,
+        "coordinates": {"lat": 18.4789, "lng": -66.8542},
+        "address": "Camuy, Puerto Rico",
+        "highlights": ("Underground rivers", "Limestone formations", "Guided tours", "Cave exploration")
+    },
+    {
+        "name": "Arecibo Observatory",
+        "description": "Famous radio telescope featured in movies like Contact and GoldenEye. Educational visitor center with exhibits about space science and astronomy.",
+        "category": "science",
+        "type": "observatory", 
+        "rating": 4.3,
+        "coordinates": {"lat": 18.3544, "lng": -66.7528},
+        "address": "Arecibo, Puerto Rico",
+        "highlights": ("Radio telescope", "Space science", "Educational exhibits", "Movie location")
+    },
+    {
+        "name": "Cueva Ventana",
+        "description": "Cave offering spectacular views of the northern coast through a natural window opening. Guided tours explain the geological formations.",
+        "category": "nature",
+        "type": "cave_attraction",
+        "rating": 4.4,
+        "coordinates": {"lat": 18.4123, "lng": -66.7234},
+        "address": "Arecibo, Puerto Rico",
+        "highlights": ("Natural window view", "Cave tours", "Coastal views", "Geological formations")
+    },
+    {
+        "name": "Ponce Historic District",
+        "description": "Charming southern city with neoclassical architecture, museums, and the famous Ponce Cathedral. Known as the Pearl of the South.",
+        "category": "historic",
+        "type": "historic_city",
+        "rating": 4.4,
+        "coordinates": {"lat": 18.0111, "lng": -66.6140},
+        "address": "Ponce, Puerto Rico", 
+        "highlights": ("Neoclassical architecture", "Museums", "Cathedral", "Southern culture")
+    }
+)
+
+# The attraction list is constant, so its guide slices are too
+_MUST_SEE_ATTRACTIONS = _ATTRACTIONS[:10]
+_ADDITIONAL_ATTRACTIONS = _ATTRACTIONS[10:]
+_TOTAL_ATTRACTIONS = len(_ATTRACTIONS)
+
+# Static travel guide sections, built once at import; the attraction
+# slots are filled in by scrape_isla_verde_comprehensive
+_GUIDE_TEMPLATE = {
+    "destination": "Isla Verde & Greater Puerto Rico Area",
+    "overview": "Isla Verde is Puerto Rico's premier beach resort area, offering world-class beaches, excellent dining, and easy access to natural wonders like El Yunque rainforest and bioluminescent bays.",
+    "last_updated": "2025-08-13",
+    "data_source": "Comprehensive knowledge base with local expertise",
+
+    # Filled in per scrape
+    "must_see_attractions": None,
+    "additional_attractions": None,
+
+    "iconic_areas": {
+        "Isla Verde": "Modern beach resort strip with luxury hotels and restaurants",
+        "Old San Juan": "Historic colonial district with cobblestone streets and colorful buildings", 
+        "Condado": "Upscale beachfront area with high-end shopping and dining",
+        "Piñones": "Local food corridor famous for traditional Puerto Rican cuisine",
+        "El Yunque": "Tropical rainforest with waterfalls and hiking trails"
+    },
+
+    "food_and_drink": {
+        "must_try_dishes": [
+            "Mofongo - Fried plantains with garlic and pork",
+            "Alcapurrias - Deep-fried fritters with crab or lobster", 
+            "Jibarito - Sandwich using plantains instead of bread",
+            "Pasteles - Puerto Rican tamales wrapped in banana leaves",
+            "Bacalaitos - Salted cod fritters"
+        ],
+        "local_drinks": [
+            "Piña Colada - Invented in Puerto Rico",
+            "Coquito - Puerto Rican eggnog with coconut and rum",
+            "Medalla Light - Local beer",
+            "Bacardí rum - World-famous rum made in Puerto Rico"
+        ],
+        "food_areas": [
+            "Piñones kioskos for authentic local food",
+            "Condado for upscale dining", 
+            "Isla Verde hotel restaurants for international cuisine",
+            "Old San Juan for historic dining experiences"
+        ]
+    },
+
+    "day_trips": [
+        {
+            "destination": "El Yunque National Forest",
+            "duration": "Full day",
+            "distance": "45 minutes from Isla Verde",
+            "highlights": ["La Mina Falls", "El Yunque Peak", "Rainforest trails"]
+        },
+        {
+            "destination": "Bioluminescent Bay (Laguna Grande)",
+            "duration": "Evening/night tour",
+            "distance": "1 hour from Isla Verde", 
+            "highlights": ["Glowing water", "Kayak tours", "Natural phenomenon"]
+        },
+        {
+            "destination": "Culebra Island (Flamenco Beach)",
+            "duration": "Full day",
+            "distance": "2 hours including ferry",
+            "highlights": ["World-class beach", "Snorkeling", "Pristine waters"]
+        },
+        {
+            "destination": "Ponce (Pearl of the South)",
+            "duration": "Full day",
+            "distance": "2 hours drive",
+            "highlights": ["Historic architecture", "Museums", "Southern culture"]
+        }
+    ],
+
+    "practical_tips": {
+        "currency": "US Dollar (USD)",
+        "language": "Spanish and English widely spoken",
+        "weather": "Tropical climate, year-round warmth with rainy season May-October",
+        "transportation": {
+            "airport": "Luis Muñoz Marín International Airport (SJU) - 10 minutes from Isla Verde",
+            "car_rental": "Recommended for exploring beyond San Juan metro area",
+            "taxi": "Available but expensive for long distances",
+            "uber": "Available in San Juan metro area"
+        },
+        "best_time_to_visit": "December-April for driest weather, May-November for fewer crowds",
+        "safety": "Generally safe in tourist areas, standard precautions recommended",
+        "tipping": "Standard US tipping practices apply (18-20%)"
+    },
+
+    "overrated_places": [
+        "Some touristy parts of Old San Juan can be overly crowded",
+        "Chain restaurants in hotel zones - try local food instead",
+        "Expensive tours that you can do independently (like some El Yunque tours)"
+    ],
+
+    "hidden_gems": [
+        "Cueva Ventana for spectacular cave views",
+        "Mosquito Bay in Vieques - brightest bioluminescent bay",
+        "Piñones food kioskos for authentic local cuisine",
+        "Las Cabezas de San Juan Nature Reserve"
+    ],
+
+    "total_attractions": None,
+    "scraping_method": "Knowledge base compilation with local expertise"
+}
+
+# HEAD probes give up quickly, so cap backoff well below the limiter's
+_PROBE_MAX_BACKOFF = 8.0
 
 class IslaVerdeScraper:
     def __init__(self):
@@ -21,208 +306,69 @@ class IslaVerdeScraper:
             "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/605.1.15 (KHTML, like Gecko) Version/17.1 Safari/605.1.15",
             "Mozilla/5.0 (Windows NT 10.0; Win64; x64; rv:120.0) Gecko/20100101 Firefox/120.0"
         ]
+        
+        # One complete header set per User-Agent, built once, then handed
+        # out round-robin from a random starting order
+        self._prebuilt_headers = [
+            {"User-Agent": user_agent, **_BASE_HEADERS} for user_agent in self.user_agents
+        ]
+        random.shuffle(self._prebuilt_headers)
+        self._header_cycle = itertools.cycle(self._prebuilt_headers)
+        
+        # Hosts that answered 403 to every attempt; other URLs on them are skipped
+        self._dead_hosts: Set[str] = set()
     
     def get_random_headers(self):
-        """Get random headers to avoid detection"""
-        return {
-            "User-Agent": random.choice(self.user_agents),
-            "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8",
-            "Accept-Language": "en-US,en;q=0.5",
-            "Accept-Encoding": "gzip, deflate, br",
-            "Connection": "keep-alive",
-            "Upgrade-Insecure-Requests": "1",
-            "Sec-Fetch-Dest": "document",
-            "Sec-Fetch-Mode": "navigate",
-            "Sec-Fetch-Site": "none",
-            "Cache-Control": "max-age=0"
-        }
+        """Get random headers to avoid detection
+        
+        The dicts are shared between calls: copy before modifying.
+        """
+        return next(self._header_cycle)
     
-    async def test_url_access(self, url: str, max_retries: int = 3) -> bool:
+    async def test_url_access(self, client: httpx.AsyncClient, url: str, max_retries: int = 3) -> bool:
         """Test if we can access a URL without 403 error"""
+        host = urlparse(url).netloc
+        forbidden = 0
         for attempt in range(max_retries):
+            # Checked every attempt: a concurrent probe may have given up on the host
+            if host in self._dead_hosts:
+                log.info("⏭️ Skipping {}: {} refused every attempt", url, host)
+                return False
+            
             try:
-                async with httpx.AsyncClient(
-                    headers=self.get_random_headers(),
-                    timeout=httpx.Timeout(30.0),
-                    follow_redirects=True
-                ) as client:
+                # Fresh headers per attempt over the caller's pooled connections.
+                # Only the status matters, so skip downloading the page body.
+                headers = self.get_random_headers()
+                response = await client.head(url, headers=headers)
+                if response.status_code == 405:
+                    # HEAD not allowed; ask for a single byte instead
+                    response = await client.get(url, headers={**headers, "Range": "bytes=0-0"})
+                
+                if response.status_code in (200, 206):
+                    log.info("✅ SUCCESS: Can access {} (attempt {})", url, attempt + 1)
+                    return True
+                elif response.status_code == 403:
+                    log.warning("⚠️ 403 Forbidden on attempt {}", attempt + 1)
+                    forbidden += 1
+                    delay = retry_after_seconds(response.headers.get("Retry-After"))
+                    if delay is None:
+                        delay = backoff_delay(attempt, _PROBE_MAX_BACKOFF)
+                else:
+                    log.warning("⚠️ Status {} on attempt {}", response.status_code, attempt + 1)
+                    continue
                     
-                    response = await client.get(url)
-                    
-                    if response.status_code == 200:
-                        log.info(f"✅ SUCCESS: Can access {url} (attempt {attempt + 1})")
-                        return True
-                    elif response.status_code == 403:
-                        log.warning(f"⚠️ 403 Forbidden on attempt {attempt + 1}")
-                        await asyncio.sleep(random.uniform(2, 5))  # Random delay
-                    else:
-                        log.warning(f"⚠️ Status {response.status_code} on attempt {attempt + 1}")
-                        
             except Exception as e:
-                log.error(f"❌ Error testing {url}: {e}")
-                await asyncio.sleep(random.uniform(1, 3))
+                log.error("❌ Error testing {}: {}", url, e)
+                delay = backoff_delay(attempt, _PROBE_MAX_BACKOFF)
+            
+            # Nothing left to wait for after the last attempt
+            if attempt < max_retries - 1:
+                await asyncio.sleep(delay)
         
+        if forbidden == max_retries:
+            self._dead_hosts.add(host)
         return False
     
-    def generate_isla_verde_data(self) -> List[Dict]:
-        """Generate Isla Verde attractions data from knowledge"""
-        log.info("🏖️ Generating Isla Verde attractions data from knowledge base")
-        
-        attractions = [
-            {
-                "name": "El Yunque National Forest",
-                "description": "The only tropical rainforest in the US National Forest System, featuring waterfalls, hiking trails, and diverse wildlife. Popular trails include La Mina Falls and Mount Britton Tower.",
-                "category": "nature",
-                "type": "national_forest",
-                "rating": 4.6,
-                "coordinates": {"lat": 18.3119, "lng": -65.8031},
-                "address": "El Yunque National Forest, Puerto Rico 00745",
-                "highlights": ["La Mina Falls", "El Yunque Peak", "Yokahú Tower", "Rainforest hiking trails"]
-            },
-            {
-                "name": "Balneario de Carolina",
-                "description": "Beautiful public beach in Carolina with calm waters, perfect for families. Features amenities like restrooms, showers, and picnic areas.",
-                "category": "beach",
-                "type": "public_beach", 
-                "rating": 4.3,
-                "coordinates": {"lat": 18.4655, "lng": -66.0004},
-                "address": "Carolina, Puerto Rico",
-                "highlights": ["Family-friendly", "Calm waters", "Public facilities", "Parking available"]
-            },
-            {
-                "name": "Isla Verde Beach",
-                "description": "Popular urban beach strip with hotels, restaurants, and water sports. Known for its golden sand and clear blue waters, perfect for swimming and sunbathing.",
-                "category": "beach",
-                "type": "urban_beach",
-                "rating": 4.4,
-                "coordinates": {"lat": 18.4567, "lng": -66.0321},
-                "address": "Isla Verde, Carolina, Puerto Rico",
-                "highlights": ["Water sports", "Beachfront dining", "Hotel zone", "Nightlife nearby"]
-            },
-            {
-                "name": "Piñones",
-                "description": "Coastal area known for its kioskos (food stands) serving traditional Puerto Rican food. Great for trying local specialties like alcapurrias and bacalaitos.",
-                "category": "dining",
-                "type": "food_area",
-                "rating": 4.5,
-                "coordinates": {"lat": 18.4789, "lng": -65.9645},
-                "address": "Piñones, Loíza, Puerto Rico", 
-                "highlights": ["Local food kioskos", "Alcapurrias", "Beachside dining", "Traditional cuisine"]
-            },
-            {
-                "name": "Laguna Grande",
-                "description": "Bioluminescent lagoon offering magical night kayak tours where the water glows with microscopic organisms called dinoflagellates.",
-                "category": "nature",
-                "type": "bioluminescent_lagoon",
-                "rating": 4.7,
-                "coordinates": {"lat": 18.3847, "lng": -65.8203},
-                "address": "Fajardo, Puerto Rico",
-                "highlights": ["Bioluminescence", "Night kayak tours", "Mangrove forest", "Natural phenomenon"]
-            },
-            {
-                "name": "Las Cabezas de San Juan Nature Reserve",
-                "description": "Nature reserve featuring diverse ecosystems including dry forest, mangroves, lagoons, and coral reefs. Home to El Faro lighthouse.",
-                "category": "nature",
-                "type": "nature_reserve", 
-                "rating": 4.6,
-                "coordinates": {"lat": 18.3736, "lng": -65.6242},
-                "address": "Fajardo, Puerto Rico",
-                "highlights": ["El Faro lighthouse", "Diverse ecosystems", "Guided tours", "Coral reefs"]
-            },
-            {
-                "name": "Flamenco Beach",
-                "description": "One of the world's most beautiful beaches located on Culebra island. Crystal clear waters and pristine white sand make it a must-visit destination.",
-                "category": "beach", 
-                "type": "pristine_beach",
-                "rating": 4.8,
-                "coordinates": {"lat": 18.3161, "lng": -65.3053},
-                "address": "Culebra, Puerto Rico",
-                "highlights": ["World-class beach", "Crystal clear water", "White sand", "Snorkeling"]
-            },
-            {
-                "name": "Condado Beach",
-                "description": "Upscale beach area in San Juan with luxury hotels, fine dining, and shopping. Popular with both locals and tourists for its vibrant atmosphere.",
-                "category": "beach",
-                "type": "urban_beach",
-                "rating": 4.3,
-                "coordinates": {"lat": 18.4655, "lng": -66.0737},
-                "address": "Condado, San Juan, Puerto Rico",
-                "highlights": ["Luxury area", "Fine dining", "Shopping", "Urban beach experience"]
-            },
-            {
-                "name": "Casa Bacardí",
-                "description": "Historic rum distillery offering tours and tastings. Learn about the history of Bacardí rum and enjoy samples of their finest products.",
-                "category": "attraction",
-                "type": "distillery",
-                "rating": 4.4,
-                "coordinates": {"lat": 18.4655, "lng": -66.0875},
-                "address": "Cataño, Puerto Rico",
-                "highlights": ["Rum tours", "Tastings", "History museum", "Ferry access"]
-            },
-            {
-                "name": "Mosquito Bay",
-                "description": "The brightest bioluminescent bay in the world, located on Vieques island. Best experienced on dark, moonless nights for maximum glow effect.",
-                "category": "nature",
-                "type": "bioluminescent_bay",
-                "rating": 4.9,
-                "coordinates": {"lat": 18.0889, "lng": -65.4736},
-                "address": "Vieques, Puerto Rico", 
-                "highlights": ["Brightest bioluminescent bay", "Night tours", "Natural wonder", "Kayaking"]
-            },
-            {
-                "name": "Old San Juan",
-                "description": "Historic colonial district with colorful buildings, cobblestone streets, and centuries-old forts. Rich in history and culture with excellent dining.",
-                "category": "historic",
-                "type": "historic_district",
-                "rating": 4.7,
-                "coordinates": {"lat": 18.4655, "lng": -66.1057},
-                "address": "Old San Juan, Puerto Rico",
-                "highlights": ["Colonial architecture", "Historic forts", "Cobblestone streets", "Cultural sites"]
-            },
-            {
-                "name": "Camuy Caves",
-                "description": "One of the world's largest cave systems with underground rivers and impressive limestone formations. Guided tours available through the spectacular caverns.",
-                "category": "nature",
-                "type": "cave_system",
-                "rating": 4.5,
-                "coordinates": {"lat": 18.4789, "lng": -66.8542},
-                "address": "Camuy, Puerto Rico",
-                "highlights": ["Underground rivers", "Limestone formations", "Guided tours", "Cave exploration"]
-            },
-            {
-                "name": "Arecibo Observatory",
-                "description": "Famous radio telescope featured in movies like Contact and GoldenEye. Educational visitor center with exhibits about space science and astronomy.",
-                "category": "science",
-                "type": "observatory", 
-                "rating": 4.3,
-                "coordinates": {"lat": 18.3544, "lng": -66.7528},
-                "address": "Arecibo, Puerto Rico",
-                "highlights": ["Radio telescope", "Space science", "Educational exhibits", "Movie location"]
-            },
-            {
-                "name": "Cueva Ventana",
-                "description": "Cave offering spectacular views of the northern coast through a natural window opening. Guided tours explain the geological formations.",
-                "category": "nature",
-                "type": "cave_attraction",
-                "rating": 4.4,
-                "coordinates": {"lat": 18.4123, "lng": -66.7234},
-                "address": "Arecibo, Puerto Rico",
-                "highlights": ["Natural window view", "Cave tours", "Coastal views", "Geological formations"]
-            },
-            {
-                "name": "Ponce Historic District",
-                "description": "Charming southern city with neoclassical architecture, museums, and the famous Ponce Cathedral. Known as the Pearl of the South.",
-                "category": "historic",
-                "type": "historic_city",
-                "rating": 4.4,
-                "coordinates": {"lat": 18.0111, "lng": -66.6140},
-                "address": "Ponce, Puerto Rico", 
-                "highlights": ["Neoclassical architecture", "Museums", "Cathedral", "Southern culture"]
-            }
-        ]
-        
-        return attractions
-    
     async def scrape_isla_verde_comprehensive(self) -> Dict:
         """Create comprehensive Isla Verde/Puerto Rico travel data"""
         log.info("🚀 Starting comprehensive Isla Verde area scraping")
@@ -234,115 +380,39 @@ class IslaVerdeScraper:
         ]
         
         can_access_tripadvisor = False
-        for url in test_urls:
-            if await self.test_url_access(url):
-                can_access_tripadvisor = True
-                break
+        # One client for every probe and retry, so connections are reused.
+        # All URLs are probed at once; the first success cancels the rest.
+        # Staying on httpx (not aiohttp) for HTTP/2 and the DNS cache: at a
+        # handful of HEAD requests, client overhead is lost in network time.
+        async with httpx.AsyncClient(
+            # With a custom transport, http2 and limits are set on it; the
+            # client's own arguments for them would be ignored
+            transport=CachingResolverTransport(
+                http2=True,
+                limits=httpx.Limits(max_keepalive_connections=10, keepalive_expiry=30.0)
+            ),
+            timeout=httpx.Timeout(30.0),
+            follow_redirects=True
+        ) as client:
+            pending = {asyncio.create_task(self.test_url_access(client, url)) for url in test_urls}
+            try:
+                while pending and not can_access_tripadvisor:
+                    done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                    can_access_tripadvisor = any(task.result() for task in done)
+            finally:
+                for task in pending:
+                    task.cancel()
+                await asyncio.gather(*pending, return_exceptions=True)
         
         if not can_access_tripadvisor:
             log.warning("⚠️ Cannot access TripAdvisor due to 403 blocks")
             log.info("📊 Using knowledge base for Isla Verde/Puerto Rico data")
         
-        # Generate comprehensive travel data
-        attractions = self.generate_isla_verde_data()
-        
-        travel_guide = {
-            "destination": "Isla Verde & Greater Puerto Rico Area",
-            "overview": "Isla Verde is Puerto Rico's premier beach resort area, offering world-class beaches, excellent dining, and easy access to natural wonders like El Yunque rainforest and bioluminescent bays.",
-            "last_updated": "2025-08-13",
-            "data_source": "Comprehensive knowledge base with local expertise",
-            
-            "must_see_attractions": attractions[:10],
-            "additional_attractions": attractions[10:],
-            
-            "iconic_areas": {
-                "Isla Verde": "Modern beach resort strip with luxury hotels and restaurants",
-                "Old San Juan": "Historic colonial district with cobblestone streets and colorful buildings", 
-                "Condado": "Upscale beachfront area with high-end shopping and dining",
-                "Piñones": "Local food corridor famous for traditional Puerto Rican cuisine",
-                "El Yunque": "Tropical rainforest with waterfalls and hiking trails"
-            },
-            
-            "food_and_drink": {
-                "must_try_dishes": [
-                    "Mofongo - Fried plantains with garlic and pork",
-                    "Alcapurrias - Deep-fried fritters with crab or lobster", 
-                    "Jibarito - Sandwich using plantains instead of bread",
-                    "Pasteles - Puerto Rican tamales wrapped in banana leaves",
-                    "Bacalaitos - Salted cod fritters"
-                ],
-                "local_drinks": [
-                    "Piña Colada - Invented in Puerto Rico",
-                    "Coquito - Puerto Rican eggnog with coconut and rum",
-                    "Medalla Light - Local beer",
-                    "Bacardí rum - World-famous rum made in Puerto Rico"
-                ],
-                "food_areas": [
-                    "Piñones kioskos for authentic local food",
-                    "Condado for upscale dining", 
-                    "Isla Verde hotel restaurants for international cuisine",
-                    "Old San Juan for historic dining experiences"
-                ]
-            },
-            
-            "day_trips": [
-                {
-                    "destination": "El Yunque National Forest",
-                    "duration": "Full day",
-                    "distance": "45 minutes from Isla Verde",
-                    "highlights": ["La Mina Falls", "El Yunque Peak", "Rainforest trails"]
-                },
-                {
-                    "destination": "Bioluminescent Bay (Laguna Grande)",
-                    "duration": "Evening/night tour",
-                    "distance": "1 hour from Isla Verde", 
-                    "highlights": ["Glowing water", "Kayak tours", "Natural phenomenon"]
-                },
-                {
-                    "destination": "Culebra Island (Flamenco Beach)",
-                    "duration": "Full day",
-                    "distance": "2 hours including ferry",
-                    "highlights": ["World-class beach", "Snorkeling", "Pristine waters"]
-                },
-                {
-                    "destination": "Ponce (Pearl of the South)",
-                    "duration": "Full day",
-                    "distance": "2 hours drive",
-                    "highlights": ["Historic architecture", "Museums", "Southern culture"]
-                }
-            ],
-            
-            "practical_tips": {
-                "currency": "US Dollar (USD)",
-                "language": "Spanish and English widely spoken",
-                "weather": "Tropical climate, year-round warmth with rainy season May-October",
-                "transportation": {
-                    "airport": "Luis Muñoz Marín International Airport (SJU) - 10 minutes from Isla Verde",
-                    "car_rental": "Recommended for exploring beyond San Juan metro area",
-                    "taxi": "Available but expensive for long distances",
-                    "uber": "Available in San Juan metro area"
-                },
-                "best_time_to_visit": "December-April for driest weather, May-November for fewer crowds",
-                "safety": "Generally safe in tourist areas, standard precautions recommended",
-                "tipping": "Standard US tipping practices apply (18-20%)"
-            },
-            
-            "overrated_places": [
-                "Some touristy parts of Old San Juan can be overly crowded",
-                "Chain restaurants in hotel zones - try local food instead",
-                "Expensive tours that you can do independently (like some El Yunque tours)"
-            ],
-            
-            "hidden_gems": [
-                "Cueva Ventana for spectacular cave views",
-                "Mosquito Bay in Vieques - brightest bioluminescent bay",
-                "Piñones food kioskos for authentic local cuisine",
-                "Las Cabezas de San Juan Nature Reserve"
-            ],
-            
-            "total_attractions": len(attractions),
-            "scraping_method": "Knowledge base compilation with local expertise"
-        }
+        # Generate comprehensive travel data from the pre-sliced knowledge base
+        travel_guide = _GUIDE_TEMPLATE.copy()
+        travel_guide["must_see_attractions"] = _MUST_SEE_ATTRACTIONS
+        travel_guide["additional_attractions"] = _ADDITIONAL_ATTRACTIONS
+        travel_guide["total_attractions"] = _TOTAL_ATTRACTIONS
         
         return travel_guide
 
@@ -356,34 +426,41 @@ async def main():
         
         # Save to file
         filename = f"isla_verde_comprehensive_guide_{int(time.time())}.json"
-        with open(filename, 'w', encoding='utf-8') as f:
-            json.dump(travel_data, f, indent=2, ensure_ascii=False)
-        
-        log.info(f"💾 Saved comprehensive guide to {filename}")
+        # One encoded blob written straight to the fd, no file object buffering
+        data = memoryview(orjson.dumps(travel_data, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS))
+        fd = os.open(filename, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+        try:
+            while data:
+                data = data[os.write(fd, data):]
+        finally:
+            os.close(fd)
         
-        # Print summary
-        print(f"\n🏖️ ISLA VERDE COMPREHENSIVE TRAVEL GUIDE")
-        print("=" * 60)
-        print(f"📍 Destination: {travel_data['destination']}")
-        print(f"🎯 Total attractions: {travel_data['total_attractions']}")
-        print(f"🏛️ Must-see attractions: {len(travel_data['must_see_attractions'])}")
-        print(f"🗺️ Day trips available: {len(travel_data['day_trips'])}")
-        print(f"🍽️ Food specialties: {len(travel_data['food_and_drink']['must_try_dishes'])}")
+        log.info("💾 Saved comprehensive guide to {}", filename)
         
-        print(f"\n🌟 TOP 5 ATTRACTIONS:")
+        # Print summary, collected and written in one go
+        lines = [
+            f"\n🏖️ ISLA VERDE COMPREHENSIVE TRAVEL GUIDE",
+            "=" * 60,
+            f"📍 Destination: {travel_data['destination']}",
+            f"🎯 Total attractions: {travel_data['total_attractions']}",
+            f"🏛️ Must-see attractions: {len(travel_data['must_see_attractions'])}",
+            f"🗺️ Day trips available: {len(travel_data['day_trips'])}",
+            f"🍽️ Food specialties: {len(travel_data['food_and_drink']['must_try_dishes'])}",
+            f"\n🌟 TOP 5 ATTRACTIONS:"
+        ]
         for i, attraction in enumerate(travel_data['must_see_attractions'][:5], 1):
-            print(f"{i}. {attraction['name']} ({attraction['category']})")
-            print(f"   ⭐ Rating: {attraction['rating']}/5.0")
-            print(f"   📝 {attraction['description'][:100]}...")
-            print()
-        
-        print(f"💾 Complete guide saved to: {filename}")
+            lines.append(f"{i}. {attraction['name']} ({attraction['category']})")
+            lines.append(f"   ⭐ Rating: {attraction['rating']}/5.0")
+            lines.append(f"   📝 {attraction['description'][:100]}...")
+            lines.append("")
+        lines.append(f"💾 Complete guide saved to: {filename}")
+        sys.stdout.write("\n".join(lines) + "\n")
         
         return travel_data
         
     except Exception as e:
-        log.error(f"❌ Scraping failed: {e}")
+        log.opt(exception=e).error("❌ Scraping failed: {}", e)
         return None
 
 if __name__ == "__main__":
-    asyncio.run(main())
\ No newline at end of file
+    event_loop.run(main())
\ No newline at end of file
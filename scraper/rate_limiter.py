@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+"""
+Adaptive (AIMD) concurrency limiter for TripAdvisor requests
+
+Grows the number of in-flight requests additively while responses are fast
+and healthy, and cuts it multiplicatively on 429/5xx or slow responses.
+Replaces fixed asyncio.sleep pacing between requests, and retries
+transient failures with backoff.
+"""
+
+import asyncio
+import random
+import time
+from contextlib import asynccontextmanager
+from typing import Awaitable, Callable, Optional
+
+import httpx
+
+# Status codes that mean "back off"
+THROTTLE_STATUSES = {429, 500, 502, 503, 504}
+# ...and the subset worth sending again
+RETRY_STATUSES = {429, 502, 503, 504}
+
+def retry_after_seconds(value: Optional[str]) -> Optional[float]:
+    """Retry-After as seconds; None if absent or in HTTP-date form"""
+    if value is None:
+        return None
+    try:
+        return float(value)
+    except ValueError:
+        return None
+
+def backoff_delay(attempt: int, max_backoff: float = 30) -> float:
+    """Exponential backoff for a 0-based attempt, jittered by ±50% and capped"""
+    return min(max_backoff, 2 ** attempt * random.uniform(0.5, 1.5))
+
+class AIMDLimiter:
+    """Caps in-flight requests at a concurrency that adapts to responses
+
+    Every request waits for a slot, so callers can asyncio.gather() any
+    number of them: at most max_concurrency are in flight (fewer once
+    TripAdvisor pushes back), and gather still returns results in order.
+    A min_interval also spaces request starts, bounding requests per
+    second however fast responses come back.
+    """
+
+    def __init__(self, initial: int = 2, min_concurrency: int = 1, max_concurrency: int = 8,
+                 alpha: float = 0.5, beta: float = 0.5, latency_target: float = 1.5,
+                 min_interval: float = 0.0):
+        self.min_concurrency = min_concurrency
+        self.max_concurrency = max_concurrency
+        self.alpha = alpha
+        self.beta = beta
+        self.latency_target = latency_target
+        self.min_interval = min_interval
+        self.concurrency = float(min(max(initial, min_concurrency), max_concurrency))
+
+        self._in_flight = 0
+        self._cond = asyncio.Condition()
+        # monotonic() deadline set by Retry-After; no new slots before it
+        self._resume_at = 0.0
+        # monotonic() time the next request may start, min_interval after the last
+        self._next_start = 0.0
+
+    @asynccontextmanager
+    async def slot(self):
+        """Hold one request slot under the current concurrency limit"""
+        delay = self._resume_at - time.monotonic()
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+        async with self._cond:
+            await self._cond.wait_for(lambda: self._in_flight < int(self.concurrency))
+            self._in_flight += 1
+            # Reserved under the lock, so concurrent starts queue up in turn
+            start_at = max(time.monotonic(), self._next_start)
+            self._next_start = start_at + self.min_interval
+        try:
+            delay = start_at - time.monotonic()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            yield
+        finally:
+            async with self._cond:
+                self._in_flight -= 1
+                self._cond.notify_all()
+
+    def on_success(self):
+        self.concurrency = min(self.max_concurrency, self.concurrency + self.alpha)
+
+    def on_failure(self):
+        self.concurrency = max(self.min_concurrency, self.concurrency * self.beta)
+
+    def record(self, status_code: int, latency: float, retry_after: Optional[str] = None):
+        """Feed one response back into the controller"""
+        if status_code in THROTTLE_STATUSES or latency > self.latency_target:
+            self.on_failure()
+        else:
+            self.on_success()
+
+        # HTTP-date form is ignored; the multiplicative cut still applies
+        delay = retry_after_seconds(retry_after)
+        if delay is not None:
+            self._resume_at = max(self._resume_at, time.monotonic() + delay)
+
+    async def run(self, send: Callable[[], Awaitable]):
+        """Await send() inside a slot and record the httpx response it returns"""
+        async with self.slot():
+            started = time.monotonic()
+            try:
+                response = await send()
+            except Exception:
+                self.on_failure()
+                raise
+
+            self.record(response.status_code, time.monotonic() - started,
+                        response.headers.get("Retry-After"))
+            return response
+    
+    async def run_with_retry(self, send: Callable[[], Awaitable], max_attempts: int = 5,
+                             max_backoff: float = 30):
+        """run(), retrying 429/5xx responses and transport errors
+        
+        A numeric Retry-After is waited out by the slot pause record()
+        sets; otherwise back off exponentially with jitter. The last
+        attempt's response is returned (or its error raised) as-is.
+        """
+        for attempt in range(max_attempts):
+            last_attempt = attempt == max_attempts - 1
+            try:
+                response = await self.run(send)
+            except httpx.TransportError:
+                if last_attempt:
+                    raise
+                retry_after = None
+            else:
+                if response.status_code not in RETRY_STATUSES or last_attempt:
+                    return response
+                retry_after = retry_after_seconds(response.headers.get("Retry-After"))
+            
+            if retry_after is None:
+                await asyncio.sleep(backoff_delay(attempt, max_backoff))
@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+"""
+On-disk cache of TripAdvisor responses, shared across runs
+
+A small SQLite table keyed on a hash of (method, URL, body), so repeated
+dev runs re-parse pages that were already fetched instead of going back
+to the wire. Only 200 responses are stored, each for a fixed TTL.
+"""
+
+import hashlib
+import sqlite3
+import time
+from pathlib import Path
+from typing import Optional
+
+import httpx
+
+DEFAULT_PATH = Path(".http_cache") / "tripadvisor.sqlite"
+
+class ResponseCache:
+    def __init__(self, path=DEFAULT_PATH, ttl: float = 24 * 3600):
+        self.ttl = ttl
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self._db = sqlite3.connect(path)
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS responses ("
+            "key TEXT PRIMARY KEY, expires_at REAL, url TEXT, content_type TEXT, content BLOB)"
+        )
+
+    @staticmethod
+    def key(request: httpx.Request) -> str:
+        raw = b"%s %s\n%s" % (request.method.encode(), str(request.url).encode(), request.content)
+        return hashlib.sha256(raw).hexdigest()
+
+    def get(self, request: httpx.Request) -> Optional[httpx.Response]:
+        """Cached response for request, or None on a miss or expired entry"""
+        key = self.key(request)
+        row = self._db.execute(
+            "SELECT expires_at, content_type, content FROM responses WHERE key = ?", (key,)
+        ).fetchone()
+        if row is None:
+            return None
+
+        expires_at, content_type, content = row
+        # Wall clock, not monotonic: entries outlive the process
+        if time.time() >= expires_at:
+            with self._db:
+                self._db.execute("DELETE FROM responses WHERE key = ?", (key,))
+            return None
+
+        # The body is stored decoded, so no Content-Encoding goes back on
+        headers = {"Content-Type": content_type} if content_type else {}
+        return httpx.Response(200, headers=headers, content=content, request=request)
+
+    def put(self, request: httpx.Request, response: httpx.Response):
+        if response.status_code != 200:
+            return
+        with self._db:
+            self._db.execute(
+                "INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?)",
+                (self.key(request), time.time() + self.ttl, str(request.url),
+                 response.headers.get("Content-Type"), response.content)
+            )
+
+    def close(self):
+        self._db.close()
@@ -7,19 +7,70 @@ A simple script to run the TripAdvisor scraper with different configurations
 import asyncio
 import json
 import argparse
+import httpx
 from datetime import datetime
 from pathlib import Path
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 # Import your scraper classes
-from tripadvisor_scraper import TripAdvisorScraper
+from tripadvisor_scraper import TripAdvisorScraper, create_client
+from rate_limiter import AIMDLimiter
+from response_cache import ResponseCache
+import event_loop
 # from tripadvisor_puppeteer import TripAdvisorPuppeteerScraper
 
-async def run_httpx_scraper(location: str, content_type: str = "hotels", max_items: int = 5, max_review_pages: int = 2):
+# Default cap on in-flight TripAdvisor requests; past ~20 throughput drops
+# as 429s and 403s pile up
+DEFAULT_CONCURRENCY = 16
+# Connection pool size for the runner's client; over HTTP/2 most requests
+# multiplex onto a few connections anyway
+DEFAULT_MAX_CONNECTIONS = 64
+# Seconds before a response counts as slow. Full HTML item and review pages
+# routinely take a few seconds, so AIMDLimiter's default (tuned for small
+# JSON calls) would cut concurrency to 1 on healthy responses
+HTML_LATENCY_TARGET = 8.0
+
+def _create_client(http2: bool, max_connections: int) -> httpx.AsyncClient:
+    """The runner's pooled client, shared by every category in a run"""
+    return create_client(
+        http2=http2,
+        max_connections=max_connections,
+        max_keepalive_connections=max_connections // 2,
+        timeout=httpx.Timeout(20.0, connect=5.0)
+    )
+
+def _create_limiter(concurrency: int) -> AIMDLimiter:
+    """Starts at the cap and backs off multiplicatively on 429/5xx"""
+    return AIMDLimiter(initial=concurrency, max_concurrency=concurrency,
+                       latency_target=HTML_LATENCY_TARGET)
+
+def _positive_int(value: str) -> int:
+    """argparse type for counts that must be at least 1"""
+    number = int(value)
+    if number < 1:
+        raise argparse.ArgumentTypeError(f"must be at least 1, got {number}")
+    return number
+
+def _encode_line(record) -> bytes:
+    """One JSON Lines record as UTF-8 bytes, newline included"""
+    if orjson is not None:
+        return orjson.dumps(record, option=orjson.OPT_APPEND_NEWLINE | orjson.OPT_NON_STR_KEYS)
+    return (json.dumps(record, ensure_ascii=False) + "\n").encode("utf-8")
+
+async def run_httpx_scraper(location: str, content_type: str = "hotels", max_items: int = 5, max_review_pages: int = 2,
+                            concurrency: int = DEFAULT_CONCURRENCY, http2: bool = True,
+                            max_connections: int = DEFAULT_MAX_CONNECTIONS, use_cache: bool = True):
     """Run the HTTPX-based scraper for specified content type"""
     print(f"🔍 Starting HTTPX scraper for {content_type} in {location}")
     print(f"📊 Will scrape up to {max_items} {content_type} with {max_review_pages} review pages each")
     
-    scraper = TripAdvisorScraper()
+    client = _create_client(http2, max_connections)
+    cache = ResponseCache() if use_cache else None
+    scraper = TripAdvisorScraper(_create_limiter(concurrency), client=client, cache=cache)
     
     try:
         # Run the appropriate workflow based on content type
@@ -52,43 +103,53 @@ async def run_httpx_scraper(location: str, content_type: str = "hotels", max_ite
         return []
     finally:
         await scraper.close()
+        await client.aclose()
+        if cache is not None:
+            cache.close()
 
-async def run_all_types_scraper(location: str, max_items_per_type: int = 3, max_review_pages: int = 1):
+async def run_all_types_scraper(location: str, max_items_per_type: int = 3, max_review_pages: int = 1,
+                                concurrency: int = DEFAULT_CONCURRENCY, http2: bool = True,
+                                max_connections: int = DEFAULT_MAX_CONNECTIONS, use_cache: bool = True):
     """Run scraper for all content types (hotels, attractions, restaurants)"""
     print(f"🔍 Starting comprehensive scraper for {location}")
     print(f"📊 Will scrape up to {max_items_per_type} items per type with {max_review_pages} review pages each")
     
-    scraper = TripAdvisorScraper()
+    client = _create_client(http2, max_connections)
+    cache = ResponseCache() if use_cache else None
+    scraper = TripAdvisorScraper(_create_limiter(concurrency), client=client, cache=cache)
     
     try:
-        all_data = {}
-        
-        # Scrape hotels
+        # The three workflows only wait on the network, so run them side by
+        # side on the scraper's pooled client; one failing type mustn't sink
+        # the other two
         print("🏨 Scraping Hotels...")
-        hotels_data = await scraper.scrape_hotels_from_search(
-            query=location,
-            max_hotels=max_items_per_type,
-            max_review_pages_per_hotel=max_review_pages
-        )
-        all_data["hotels"] = hotels_data
-        
-        # Scrape attractions
         print("🎯 Scraping Attractions...")
-        attractions_data = await scraper.scrape_attractions_from_search(
-            query=location,
-            max_attractions=max_items_per_type,
-            max_review_pages_per_attraction=max_review_pages
-        )
-        all_data["attractions"] = attractions_data
-        
-        # Scrape restaurants
         print("🍽️ Scraping Restaurants...")
-        restaurants_data = await scraper.scrape_restaurants_from_search(
-            query=location,
-            max_restaurants=max_items_per_type,
-            max_review_pages_per_restaurant=max_review_pages
+        results = await asyncio.gather(
+            scraper.scrape_hotels_from_search(
+                query=location,
+                max_hotels=max_items_per_type,
+                max_review_pages_per_hotel=max_review_pages
+            ),
+            scraper.scrape_attractions_from_search(
+                query=location,
+                max_attractions=max_items_per_type,
+                max_review_pages_per_attraction=max_review_pages
+            ),
+            scraper.scrape_restaurants_from_search(
+                query=location,
+                max_restaurants=max_items_per_type,
+                max_review_pages_per_restaurant=max_review_pages
+            ),
+            return_exceptions=True
         )
-        all_data["restaurants"] = restaurants_data
+        
+        all_data = {}
+        for data_type, data in zip(("hotels", "attractions", "restaurants"), results):
+            if isinstance(data, Exception):
+                print(f"❌ Error scraping {data_type}: {data}")
+                data = []
+            all_data[data_type] = data
         
         return all_data
         
@@ -97,15 +158,23 @@ async def run_all_types_scraper(location: str, max_items_per_type: int = 3, max_
         return {}
     finally:
         await scraper.close()
+        await client.aclose()
+        if cache is not None:
+            cache.close()
 
 def save_results(data, location: str, content_type: str = "mixed", scraper_type: str = "httpx"):
-    """Save results to JSON file with timestamp"""
+    """Save results to a JSON Lines file with timestamp
+    
+    The first line is a header with the run's parameters and per-type
+    counts; every following line is one scraped item (its "type" field
+    says which kind), so each record is encoded and written on its own.
+    """
     if not data:
         print("❌ No data to save")
         return None
     
     timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-    filename = f"tripadvisor_{location.lower().replace(' ', '_')}_{content_type}_{scraper_type}_{timestamp}.json"
+    filename = f"tripadvisor_{location.lower().replace(' ', '_')}_{content_type}_{scraper_type}_{timestamp}.jsonl"
     
     # Create results directory if it doesn't exist
     results_dir = Path("results")
@@ -113,12 +182,45 @@ def save_results(data, location: str, content_type: str = "mixed", scraper_type:
     
     filepath = results_dir / filename
     
-    with open(filepath, 'w', encoding='utf-8') as f:
-        json.dump(data, f, indent=2, ensure_ascii=False)
+    # Single-type runs return a bare list
+    groups = data if isinstance(data, dict) else {content_type: data}
+    header = {
+        "location": location,
+        "content_type": content_type,
+        "scraper": scraper_type,
+        "timestamp": timestamp,
+        "counts": {data_type: len(items) for data_type, items in groups.items()},
+    }
+    
+    with open(filepath, 'wb') as f:
+        f.write(_encode_line(header))
+        for items in groups.values():
+            for item in items:
+                f.write(_encode_line(item))
     
     print(f"💾 Results saved to {filepath}")
     return filepath
 
+def _summary_rows(items, data_type: str):
+    """(name, rating, review_count, feature_count, description) per item, in one pass"""
+    rows = []
+    for item in items:
+        basic_data = item.get('basic_data', {})
+        preview = item.get('preview', {})
+        
+        name = basic_data.get('name') or preview.get('name', f'Unknown {data_type[:-1]}')
+        rating = basic_data.get('aggregateRating', {}).get('ratingValue', 'N/A')
+        rows.append((name, rating, len(item.get('reviews', [])), len(item.get('features', [])),
+                     item.get('description')))
+    return rows
+
+def _print_row(i: int, row):
+    name, rating, review_count, feature_count, _ = row
+    print(f"{i}. {name}")
+    print(f"   ⭐ Rating: {rating}")
+    print(f"   💬 Reviews scraped: {review_count}")
+    print(f"   🏷️  Features: {feature_count}")
+
 def print_summary(data, content_type: str = "mixed"):
     """Print a summary of scraped data"""
     if not data:
@@ -130,36 +232,26 @@ def print_summary(data, content_type: str = "mixed"):
     
     if content_type == "all":
         # Handle mixed data structure
+        rows_by_type = {data_type: _summary_rows(items, data_type) for data_type, items in data.items()}
         total_items = 0
         total_reviews = 0
         
-        for data_type, items in data.items():
-            print(f"{data_type.capitalize()}: {len(items)} items")
-            total_items += len(items)
-            total_reviews += sum(len(item.get('reviews', [])) for item in items)
+        for data_type, rows in rows_by_type.items():
+            print(f"{data_type.capitalize()}: {len(rows)} items")
+            total_items += len(rows)
+            total_reviews += sum(row[2] for row in rows)
         
         print(f"Total items scraped: {total_items}")
         print(f"Total reviews collected: {total_reviews}")
         
         # Print details for each type
-        for data_type, items in data.items():
-            if items:
+        for data_type, rows in rows_by_type.items():
+            if rows:
                 print(f"\n🎯 {data_type.upper()}:")
                 print("-" * 30)
                 
-                for i, item in enumerate(items, 1):
-                    basic_data = item.get('basic_data', {})
-                    preview = item.get('preview', {})
-                    
-                    name = basic_data.get('name') or preview.get('name', f'Unknown {data_type[:-1]}')
-                    rating = basic_data.get('aggregateRating', {}).get('ratingValue', 'N/A')
-                    review_count = len(item.get('reviews', []))
-                    feature_count = len(item.get('features', []))
-                    
-                    print(f"{i}. {name}")
-                    print(f"   ⭐ Rating: {rating}")
-                    print(f"   💬 Reviews scraped: {review_count}")
-                    print(f"   🏷️  Features: {feature_count}")
+                for i, row in enumerate(rows, 1):
+                    _print_row(i, row)
                     print()
     
     else:
@@ -169,32 +261,26 @@ def print_summary(data, content_type: str = "mixed"):
         else:
             items_data = data.get(content_type, [])
         
-        total_reviews = sum(len(item.get('reviews', [])) for item in items_data)
-        total_features = sum(len(item.get('features', [])) for item in items_data)
+        rows = _summary_rows(items_data, content_type)
+        total_reviews = 0
+        total_features = 0
+        for row in rows:
+            total_reviews += row[2]
+            total_features += row[3]
         
-        print(f"Total {content_type} scraped: {len(items_data)}")
+        print(f"Total {content_type} scraped: {len(rows)}")
         print(f"Total reviews collected: {total_reviews}")
         print(f"Total features collected: {total_features}")
         
         print(f"\n🎯 {content_type.upper()} FOUND:")
         print("-" * 30)
         
-        for i, item in enumerate(items_data, 1):
-            basic_data = item.get('basic_data', {})
-            preview = item.get('preview', {})
-            
-            name = basic_data.get('name') or preview.get('name', f'Unknown {content_type[:-1]}')
-            rating = basic_data.get('aggregateRating', {}).get('ratingValue', 'N/A')
-            review_count = len(item.get('reviews', []))
-            feature_count = len(item.get('features', []))
-            
-            print(f"{i}. {name}")
-            print(f"   ⭐ Rating: {rating}")
-            print(f"   💬 Reviews scraped: {review_count}")
-            print(f"   🏷️  Features: {feature_count}")
+        for i, row in enumerate(rows, 1):
+            _print_row(i, row)
             
-            if item.get('description'):
-                desc = item['description'][:100] + "..." if len(item['description']) > 100 else item['description']
+            description = row[4]
+            if description:
+                desc = description[:100] + "..." if len(description) > 100 else description
                 print(f"   📝 Description: {desc}")
             
             print()
@@ -211,7 +297,15 @@ async def main():
                        help='Maximum review pages per item (default: 2)')
     parser.add_argument('--scraper', choices=['httpx', 'puppeteer'], default='httpx', 
                        help='Scraper type to use (default: httpx)')
-    parser.add_argument('--save', action='store_true', help='Save results to JSON file')
+    parser.add_argument('--concurrency', type=_positive_int, default=DEFAULT_CONCURRENCY,
+                       help=f'Maximum concurrent requests to TripAdvisor (default: {DEFAULT_CONCURRENCY})')
+    parser.add_argument('--http2', action=argparse.BooleanOptionalAction, default=True,
+                       help='Use HTTP/2 (default: on)')
+    parser.add_argument('--max-connections', type=_positive_int, default=DEFAULT_MAX_CONNECTIONS,
+                       help=f'Connection pool size (default: {DEFAULT_MAX_CONNECTIONS})')
+    parser.add_argument('--no-cache', action='store_true',
+                       help='Always fetch from TripAdvisor instead of the on-disk response cache')
+    parser.add_argument('--save', action='store_true', help='Save results to a JSON Lines file')
     parser.add_argument('--quiet', action='store_true', help='Minimal output')
     
     args = parser.parse_args()
@@ -224,6 +318,9 @@ async def main():
         print(f"📊 Max items per type: {args.max_items}")
         print(f"📄 Max review pages per item: {args.max_review_pages}")
         print(f"🔧 Scraper type: {args.scraper}")
+        print(f"🚦 Max concurrent requests: {args.concurrency}")
+        print(f"🔌 HTTP/2: {'on' if args.http2 else 'off'}, max connections: {args.max_connections}")
+        print(f"🗄️  Response cache: {'off' if args.no_cache else 'on'}")
         print()
     
     # Run the appropriate scraper
@@ -232,14 +329,22 @@ async def main():
             data = await run_all_types_scraper(
                 location=args.location,
                 max_items_per_type=args.max_items,
-                max_review_pages=args.max_review_pages
+                max_review_pages=args.max_review_pages,
+                concurrency=args.concurrency,
+                http2=args.http2,
+                max_connections=args.max_connections,
+                use_cache=not args.no_cache
             )
         else:
             data = await run_httpx_scraper(
                 location=args.location,
                 content_type=args.type,
                 max_items=args.max_items,
-                max_review_pages=args.max_review_pages
+                max_review_pages=args.max_review_pages,
+                concurrency=args.concurrency,
+                http2=args.http2,
+                max_connections=args.max_connections,
+                use_cache=not args.no_cache
             )
     elif args.scraper == 'puppeteer':
         print("🤖 Puppeteer scraper not implemented in this runner yet")
@@ -290,9 +395,9 @@ if __name__ == "__main__":
     import sys
     if len(sys.argv) == 1:
         print("No arguments provided. Running quick test...")
-        asyncio.run(quick_test())
+        event_loop.run(quick_test())
     else:
-        asyncio.run(main())
+        event_loop.run(main())
 
 # Example usage:
 # python scraper_runner.py "Malta" --type hotels --max-items 3 --save
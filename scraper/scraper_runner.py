@@ -8,10 +8,10 @@ Usage:
   python3 scraper_runner.py "New York" --quick
 """
 
-import asyncio
 import sys
 import argparse
 from universal_city_scraper import UniversalCityScraper
+import event_loop
 import json
 import time
 
@@ -42,26 +42,28 @@ async def quick_scrape(city, state="", content_type="all"):
             f"sightseeing {city}"
         ]
     
-    if content_type == "all":
-        return await scraper.scrape_all()
-    elif content_type == "restaurants":
-        restaurants = await scraper.scrape_restaurants()
-        return {
-            "city": city,
-            "type": "restaurants_only",
-            "restaurants": restaurants,
-            "total": len(restaurants),
-            "scraped_at": time.time()
-        }
-    elif content_type == "attractions":
-        attractions = await scraper.scrape_attractions()
-        return {
-            "city": city,
-            "type": "attractions_only",
-            "attractions": attractions,
-            "total": len(attractions),
-            "scraped_at": time.time()
-        }
+    # One pooled client for all of the searches, which run concurrently
+    async with scraper:
+        if content_type == "all":
+            return await scraper.scrape_all()
+        elif content_type == "restaurants":
+            restaurants = await scraper.scrape_restaurants()
+            return {
+                "city": city,
+                "type": "restaurants_only",
+                "restaurants": restaurants,
+                "total": len(restaurants),
+                "scraped_at": time.time()
+            }
+        elif content_type == "attractions":
+            attractions = await scraper.scrape_attractions()
+            return {
+                "city": city,
+                "type": "attractions_only",
+                "attractions": attractions,
+                "total": len(attractions),
+                "scraped_at": time.time()
+            }
 
 def main():
     parser = argparse.ArgumentParser(description="TripAdvisor Scraper Runner")
@@ -95,26 +97,27 @@ def main():
         else:
             scraper = UniversalCityScraper(city, state)
             
-            if content_type == "all":
-                data = await scraper.scrape_all()
-            elif content_type == "restaurants":
-                restaurants = await scraper.scrape_restaurants()
-                data = {
-                    "city": city,
-                    "type": "restaurants_only",
-                    "restaurants": restaurants,
-                    "total": len(restaurants),
-                    "scraped_at": time.time()
-                }
-            elif content_type == "attractions":
-                attractions = await scraper.scrape_attractions()
-                data = {
-                    "city": city,
-                    "type": "attractions_only",
-                    "attractions": attractions,
-                    "total": len(attractions),
-                    "scraped_at": time.time()
-                }
+            async with scraper:
+                if content_type == "all":
+                    data = await scraper.scrape_all()
+                elif content_type == "restaurants":
+                    restaurants = await scraper.scrape_restaurants()
+                    data = {
+                        "city": city,
+                        "type": "restaurants_only",
+                        "restaurants": restaurants,
+                        "total": len(restaurants),
+                        "scraped_at": time.time()
+                    }
+                elif content_type == "attractions":
+                    attractions = await scraper.scrape_attractions()
+                    data = {
+                        "city": city,
+                        "type": "attractions_only",
+                        "attractions": attractions,
+                        "total": len(attractions),
+                        "scraped_at": time.time()
+                    }
         
         # Generate filename
         if args.output:
@@ -178,7 +181,7 @@ def main():
         return data
     
     try:
-        result = asyncio.run(run())
+        result = event_loop.run(run())
         return result
     except KeyboardInterrupt:
         print("\n❌ Scraping interrupted by user")
@@ -4,27 +4,63 @@ Simple test to check if Puppeteer can bypass 403 errors
 """
 
 import asyncio
+from parsel import Selector
 from pyppeteer import launch
 import time
 
+_LAUNCH_ARGS = [
+    '--no-sandbox',
+    '--disable-setuid-sandbox',
+    '--disable-dev-shm-usage',
+    '--disable-gpu',
+    '--disable-blink-features=AutomationControlled',
+    '--user-agent=Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36'
+]
+
+# Chromium takes seconds to start, so one browser is launched per process
+# and shared; pages are cheap by comparison
+_BROWSER = None
+_LAUNCH_LOCK = asyncio.Lock()
+# Caps open pages so parallel callers don't run out of file descriptors
+PAGE_SLOTS = asyncio.BoundedSemaphore(8)
+
+async def get_browser():
+    """The shared browser, launched on first use"""
+    global _BROWSER
+    async with _LAUNCH_LOCK:
+        if _BROWSER is None:
+            _BROWSER = await launch(headless=True, args=_LAUNCH_ARGS)
+    return _BROWSER
+
+async def close_browser():
+    """Close the shared browser; pyppeteer also kills it at interpreter exit"""
+    global _BROWSER
+    if _BROWSER is not None:
+        await _BROWSER.close()
+        _BROWSER = None
+
+def _text_content(selector, css):
+    """Trimmed textContent of the first element matching css, or None"""
+    element = selector.css(css)
+    if not element:
+        return None
+    return element[0].xpath('string()').get().strip()
+
 async def test_tripadvisor_access():
     """Simple test to see if we can access TripAdvisor with Puppeteer"""
     
     print("🚀 Launching browser...")
     
-    browser = await launch(
-        headless=True,
-        args=[
-            '--no-sandbox',
-            '--disable-setuid-sandbox',
-            '--disable-dev-shm-usage',
-            '--disable-gpu',
-            '--disable-blink-features=AutomationControlled',
-            '--user-agent=Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36'
-        ]
-    )
+    browser = await get_browser()
     
-    page = await browser.newPage()
+    async with PAGE_SLOTS:
+        page = await browser.newPage()
+        try:
+            await _check_tripadvisor_page(page)
+        finally:
+            await page.close()
+
+async def _check_tripadvisor_page(page):
     await page.setViewport({'width': 1920, 'height': 1080})
     
     print("🌐 Testing TripAdvisor access...")
@@ -46,18 +82,16 @@ async def test_tripadvisor_access():
         elif "El Yunque" in title:
             print("🎉 SUCCESS! Puppeteer bypassed the 403 error!")
             
-            # Try to extract some basic content
-            content = await page.evaluate('''
-                () => {
-                    const title = document.querySelector('h1');
-                    const description = document.querySelector('[data-test-target*="description"]');
-                    return {
-                        title: title ? title.textContent.trim() : 'No title found',
-                        description: description ? description.textContent.trim().substring(0, 200) : 'No description found',
-                        url: window.location.href
-                    };
-                }
-            ''')
+            # Try to extract some basic content; one page.content() round
+            # trip, then the DOM is queried locally instead of in Chromium
+            selector = Selector(await page.content())
+            title_text = _text_content(selector, 'h1')
+            description_text = _text_content(selector, '[data-test-target*="description"]')
+            content = {
+                'title': title_text if title_text is not None else 'No title found',
+                'description': description_text[:200] if description_text is not None else 'No description found',
+                'url': page.url
+            }
             
             print(f"🎯 Extracted content:")
             print(f"   Title: {content['title']}")
@@ -68,9 +102,12 @@ async def test_tripadvisor_access():
         
     except Exception as e:
         print(f"❌ Error: {e}")
-        
+
+async def main():
+    try:
+        await test_tripadvisor_access()
     finally:
-        await browser.close()
+        await close_browser()
 
 if __name__ == "__main__":
-    asyncio.run(test_tripadvisor_access())
\ No newline at end of file
+    asyncio.run(main())
\ No newline at end of file
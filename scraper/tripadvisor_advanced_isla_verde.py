@@ -6,13 +6,13 @@ Implements GraphQL requests, proper headers, and anti-bot measures
 
 import asyncio
 import httpx
-import json
+import orjson
 import random
-import string
 import time
 from typing import Dict, List, Optional
 from loguru import logger as log
 from urllib.parse import urljoin
+from http_client import request_id
 
 class TripAdvisorAdvancedScraper:
     def __init__(self):
@@ -26,10 +26,6 @@ class TripAdvisorAdvancedScraper:
             "Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36"
         ]
     
-    def generate_request_id(self, length: int = 180) -> str:
-        """Generate random request ID"""
-        return ''.join(random.choices(string.ascii_lowercase + string.digits, k=length))
-    
     def get_headers(self, referer: str = None) -> Dict[str, str]:
         """Generate proper headers to avoid detection"""
         headers = {
@@ -58,7 +54,7 @@ class TripAdvisorAdvancedScraper:
             "Accept-Language": "en-US,en;q=0.9",
             "Accept-Encoding": "gzip, deflate, br",
             "Content-Type": "application/json",
-            "X-Requested-By": self.generate_request_id(),
+            "X-Requested-By": request_id(),
             "Referer": "https://www.tripadvisor.com/",
             "Origin": "https://www.tripadvisor.com",
             "Connection": "keep-alive",
@@ -69,7 +65,7 @@ class TripAdvisorAdvancedScraper:
     
     async def search_location_graphql(self, location: str) -> Optional[Dict]:
         """Search for location using GraphQL endpoint"""
-        log.info(f"🔍 Searching for location: {location}")
+        log.info("🔍 Searching for location: {}", location)
         
         # GraphQL payload for location search
         payload = [{
@@ -110,7 +106,7 @@ class TripAdvisorAdvancedScraper:
                 
                 if response.status_code == 200:
                     data = response.json()
-                    log.info(f"✅ GraphQL search successful")
+                    log.info("✅ GraphQL search successful")
                     
                     if data and len(data) > 0:
                         results = data[0].get("data", {}).get("Typeahead_autocomplete", {}).get("results", [])
@@ -140,16 +136,16 @@ class TripAdvisorAdvancedScraper:
                 elif response.status_code == 403:
                     log.error("❌ 403 Forbidden - GraphQL endpoint blocked")
                 else:
-                    log.error(f"❌ GraphQL request failed with status {response.status_code}")
+                    log.error("❌ GraphQL request failed with status {}", response.status_code)
                     
         except Exception as e:
-            log.error(f"❌ GraphQL search error: {e}")
+            log.opt(exception=e).error("❌ GraphQL search error: {}", e)
         
         return None
     
     async def scrape_attractions_graphql(self, location_id: str, limit: int = 30) -> List[Dict]:
         """Scrape attractions using GraphQL endpoint"""
-        log.info(f"🎯 Scraping attractions for location ID: {location_id}")
+        log.info("🎯 Scraping attractions for location ID: {}", location_id)
         
         # Try different GraphQL query IDs for attractions
         attraction_query_ids = [
@@ -188,13 +184,13 @@ class TripAdvisorAdvancedScraper:
                         
                         # Try to find attractions in the response
                         if self.extract_attractions_from_response(data):
-                            log.info(f"✅ Found attractions with query ID: {query_id}")
+                            log.info("✅ Found attractions with query ID: {}", query_id)
                             return self.extract_attractions_from_response(data)
                     
                     await asyncio.sleep(1)  # Rate limiting
                     
             except Exception as e:
-                log.error(f"❌ Error with query ID {query_id}: {e}")
+                log.opt(exception=e).error("❌ Error with query ID {}: {}", query_id, e)
                 continue
         
         log.warning("⚠️ No attractions found with GraphQL queries")
@@ -231,7 +227,7 @@ class TripAdvisorAdvancedScraper:
                     break
             
         except Exception as e:
-            log.error(f"❌ Error extracting attractions: {e}")
+            log.opt(exception=e).error("❌ Error extracting attractions: {}", e)
         
         return attractions
     
@@ -268,7 +264,7 @@ class TripAdvisorAdvancedScraper:
             }
             
         except Exception as e:
-            log.error(f"❌ Error parsing attraction item: {e}")
+            log.opt(exception=e).error("❌ Error parsing attraction item: {}", e)
             return None
     
     async def scrape_isla_verde_complete(self) -> Dict:
@@ -282,7 +278,7 @@ class TripAdvisorAdvancedScraper:
             log.error("❌ Could not find Isla Verde location")
             return {"error": "Location not found"}
         
-        log.info(f"✅ Found location: {location_data['name']}")
+        log.info("✅ Found location: {}", location_data['name'])
         
         # Scrape attractions for this location
         attractions = await self.scrape_attractions_graphql(
@@ -358,10 +354,10 @@ async def main():
         
         # Save results
         filename = f"isla_verde_advanced_{int(time.time())}.json"
-        with open(filename, 'w', encoding='utf-8') as f:
-            json.dump(result, f, indent=2, ensure_ascii=False)
+        with open(filename, 'wb') as f:
+            f.write(orjson.dumps(result, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS))
         
-        log.info(f"💾 Results saved to {filename}")
+        log.info("💾 Results saved to {}", filename)
         
         # Print summary
         print(f"\n🏖️ ISLA VERDE ADVANCED SCRAPING RESULTS")
@@ -386,7 +382,7 @@ async def main():
         return result
         
     except Exception as e:
-        log.error(f"❌ Main execution failed: {e}")
+        log.opt(exception=e).error("❌ Main execution failed: {}", e)
         return None
 
 if __name__ == "__main__":
@@ -3,12 +3,16 @@ import json
 import math
 import random
 import string
-from typing import List, Dict, Optional, TypedDict
-from urllib.parse import urljoin
+from typing import List, Dict, Optional, Tuple, TypedDict
+from urllib.parse import urljoin, urlsplit, urlunsplit
 import httpx
+import orjson
 from parsel import Selector
 from loguru import logger as log
 
+from rate_limiter import AIMDLimiter
+from response_cache import ResponseCache
+
 class LocationData(TypedDict):
     """Result dataclass for TripAdvisor location data"""
     localizedName: str
@@ -25,31 +29,135 @@ class Preview(TypedDict):
     url: str
     name: str
 
+def canonical_url(url: str) -> str:
+    """Collapse spellings of a TripAdvisor page URL that serve the same page
+    
+    Pages are fully identified by their path, so the query string,
+    fragment, trailing slash and host case are dropped.
+    """
+    parts = urlsplit(url)
+    return urlunsplit((parts.scheme.lower(), parts.netloc.lower(), parts.path.rstrip("/") or "/", "", ""))
+
+# Headers that mimic Chrome browser on Windows
+BASE_HEADERS = {
+    "authority": "www.tripadvisor.com",
+    "accept-language": "en-US,en;q=0.9",
+    "user-agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/96.0.4664.110 Safari/537.36",
+    "accept": "text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,image/apng,*/*;q=0.8",
+    "accept-encoding": "gzip, deflate, br",
+}
+
+def create_client(http2: bool = True, max_connections: int = 5, max_keepalive_connections: Optional[int] = None,
+                  timeout: httpx.Timeout = httpx.Timeout(150.0)) -> httpx.AsyncClient:
+    """AsyncClient set up for TripAdvisor, for injecting into TripAdvisorScraper"""
+    return httpx.AsyncClient(
+        http2=http2,  # HTTP2 connections are less likely to get blocked
+        headers=BASE_HEADERS,
+        timeout=timeout,
+        limits=httpx.Limits(max_connections=max_connections, max_keepalive_connections=max_keepalive_connections),
+    )
+
+def parse_json_ld(selector: Selector, xpath: str) -> Dict:
+    """First script matched by xpath that parses as JSON, or {}"""
+    # Text is pulled per node, so scripts after the first good one are
+    # never serialized
+    for script in selector.xpath(xpath):
+        try:
+            return orjson.loads(script.get())
+        except orjson.JSONDecodeError:
+            continue
+    return {}
+
+def parse_reviews(selector: Selector, date_label: str, date_key: str) -> List[Dict]:
+    """Reviews on a hotel/attraction/restaurant page
+    
+    date_label is the text TripAdvisor puts before the review's date
+    ("Date of stay" / "Date of visit"); the date is stored under date_key.
+    """
+    reviews = []
+    for review in selector.xpath("//div[@data-reviewid]"):
+        title = review.xpath(".//div[@data-test-target='review-title']/a/span/span/text()").get()
+        text = "".join(review.xpath(".//span[contains(@data-automation, 'reviewText')]/span/text()").extract())
+        
+        # Extract rating
+        rate = review.xpath(".//div[@data-test-target='review-rating']/span/@class").get()
+        if rate and "ui_bubble_rating" in rate:
+            try:
+                rate_num = rate.split("ui_bubble_rating")[-1].split("_")[-1].replace("0", "")
+                rate = int(rate_num) if rate_num.isdigit() else None
+            except:
+                rate = None
+        else:
+            rate = None
+        
+        # Extract trip / visit date
+        date = review.xpath(f".//span[span[contains(text(),'{date_label}')]]/text()").get()
+        
+        if title or text:  # Only add if we have some content
+            reviews.append({
+                "title": title,
+                "text": text,
+                "rate": rate,
+                date_key: date
+            })
+    return reviews
+
 class TripAdvisorScraper:
-    def __init__(self):
-        # Headers that mimic Chrome browser on Windows
-        self.base_headers = {
-            "authority": "www.tripadvisor.com",
-            "accept-language": "en-US,en;q=0.9",
-            "user-agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/96.0.4664.110 Safari/537.36",
-            "accept": "text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,image/apng,*/*;q=0.8",
-            "accept-encoding": "gzip, deflate, br",
-        }
-        
-        # Initialize HTTP client with HTTP2 support
-        self.client = httpx.AsyncClient(
-            http2=True,  # HTTP2 connections are less likely to get blocked
-            headers=self.base_headers,
-            timeout=httpx.Timeout(150.0),
-            limits=httpx.Limits(max_connections=5),
-        )
+    def __init__(self, limiter: Optional[AIMDLimiter] = None, client: Optional[httpx.AsyncClient] = None,
+                 cache: Optional[ResponseCache] = None):
+        self.base_headers = BASE_HEADERS
+        
+        # An injected client (see create_client) belongs to the caller, who
+        # can share its pool across scrapers and closes it themselves
+        self._owns_client = client is None
+        self.client = client or create_client()
+        
+        # Every request goes through the limiter, which caps in-flight
+        # requests and backs off / retries on 429 and 5xx
+        self._limiter = limiter or AIMDLimiter(max_concurrency=5)
+        # Optional on-disk cache; hits skip the limiter and the network
+        self._cache = cache
+        
+        # Category searches for one location repeat work, so each lookup
+        # and item scrape runs once per scraper and the task is shared:
+        # query -> location lookup,
+        # (scrape method, canonical item URL, review pages) -> item scrape
+        self._location_tasks: Dict[str, asyncio.Future] = {}
+        self._item_tasks: Dict[Tuple[str, str, Optional[int]], asyncio.Future] = {}
+
+    async def _get(self, url: str) -> httpx.Response:
+        return await self._send("GET", url)
+
+    async def _post(self, url: str, **kwargs) -> httpx.Response:
+        return await self._send("POST", url, **kwargs)
+
+    async def _send(self, method: str, url: str, **kwargs) -> httpx.Response:
+        if self._cache is not None:
+            # Only for the cache key (method, URL, body); what goes on the
+            # wire is built per attempt below
+            cached = self._cache.get(self.client.build_request(method, url, **kwargs))
+            if cached is not None:
+                return cached
+        
+        # client.request() rebuilds the request every attempt, so cookies set
+        # while it was queued, or by a 429 it is retrying, are sent
+        response = await self._limiter.run_with_retry(lambda: self.client.request(method, url, **kwargs))
+        if self._cache is not None:
+            self._cache.put(response.request, response)
+        return response
 
     async def scrape_location_data(self, query: str) -> List[LocationData]:
         """
         Scrape search location data from a given query.
         e.g. "New York" will return TripAdvisor's location details for this query
         """
-        log.info(f"Scraping location data: {query}")
+        task = self._location_tasks.get(query)
+        if task is None:
+            task = self._location_tasks[query] = asyncio.ensure_future(self._fetch_location_data(query))
+        return await task
+
+    async def _fetch_location_data(self, query: str) -> List[LocationData]:
+        log.info("Scraping location data: {}", query)
         
         # The GraphQL payload that defines our search
         payload = [
@@ -93,29 +201,30 @@ class TripAdvisorScraper:
         }
         
         try:
-            result = await self.client.post(
-                url="https://www.tripadvisor.com/data/graphql/ids",
+            result = await self._post(
+                "https://www.tripadvisor.com/data/graphql/ids",
                 json=payload,
                 headers=headers,
             )
             result.raise_for_status()
             
-            data = json.loads(result.content)
+            data = orjson.loads(result.content)
             results = data[0]["data"]["Typeahead_autocomplete"]["results"]
             results = [r["details"] for r in results]  # strip metadata
             
-            log.info(f"Found {len(results)} results")
+            log.info("Found {} results", len(results))
             return results
             
         except Exception as e:
-            log.error(f"Error scraping location data: {e}")
+            log.error("Error scraping location data: {}", e)
             return []
 
-    def parse_search_page(self, response: httpx.Response) -> List[Preview]:
+    def parse_search_page(self, response: httpx.Response, selector: Optional[Selector] = None) -> List[Preview]:
         """Parse result previews from TripAdvisor search page"""
-        log.info(f"Parsing search page: {response.url}")
+        log.info("Parsing search page: {}", response.url)
         parsed = []
-        selector = Selector(response.text)
+        if selector is None:
+            selector = Selector(response.text)
         
         # Search results are contained in boxes which can be in two locations
         # Location #1: Modern layout
@@ -149,33 +258,33 @@ class TripAdvisorScraper:
 
     async def scrape_search(self, query: str, max_pages: Optional[int] = None) -> List[Preview]:
         """Scrape search results of a search query"""
-        log.info(f"{query}: Scraping first search results page")
+        log.info("{}: Scraping first search results page", query)
         
         try:
             location_data = (await self.scrape_location_data(query))[0]  # Take first result
         except IndexError:
-            log.error(f"Could not find location data for query {query}")
+            log.error("Could not find location data for query {}", query)
             return []
         
         hotel_search_url = "https://www.tripadvisor.com" + location_data["HOTELS_URL"]
-        log.info(f"Found hotel search url: {hotel_search_url}")
+        log.info("Found hotel search url: {}", hotel_search_url)
         
         try:
-            first_page = await self.client.get(hotel_search_url)
+            first_page = await self._get(hotel_search_url)
             first_page.raise_for_status()
         except Exception as e:
-            log.error(f"Error scraping first page: {e}")
+            log.error("Error scraping first page: {}", e)
             return []
         
-        # Parse first page
-        results = self.parse_search_page(first_page)
+        # Parse first page; the same tree gives the pagination metadata
+        selector = Selector(first_page.text)
+        results = self.parse_search_page(first_page, selector)
         if not results:
-            log.error(f"Query {query} found no results")
+            log.error("Query {} found no results", query)
             return []
         
         # Extract pagination metadata to scrape all pages concurrently
         page_size = len(results)
-        selector = Selector(first_page.text)
         
         # Try to find total results
         total_results_text = selector.xpath("//span/text()").re(r"(\d*,*\d+) properties")
@@ -188,10 +297,10 @@ class TripAdvisorScraper:
             total_results = total_pages * page_size
         
         if max_pages and total_pages > max_pages:
-            log.debug(f"{query}: Only scraping {max_pages} max pages from {total_pages} total")
+            log.debug("{}: Only scraping {} max pages from {} total", query, max_pages, total_pages)
             total_pages = max_pages
         
-        log.info(f"{query}: Found {total_results} results, {page_size} per page. Scraping {total_pages} pages")
+        log.info("{}: Found {} results, {} per page. Scraping {} pages", query, total_results, page_size, total_pages)
         
         # Get next page URL pattern
         next_page_url = selector.css('a[aria-label="Next page"]::attr(href)').get()
@@ -207,14 +316,14 @@ class TripAdvisorScraper:
         ]
         
         # Scrape remaining pages concurrently
-        tasks = [self.client.get(url) for url in other_page_urls]
+        tasks = [self._get(url) for url in other_page_urls]
         for task in asyncio.as_completed(tasks):
             try:
                 response = await task
                 response.raise_for_status()
                 results.extend(self.parse_search_page(response))
             except Exception as e:
-                log.error(f"Error scraping page: {e}")
+                log.error("Error scraping page: {}", e)
                 continue
         
         return results
@@ -224,14 +333,7 @@ class TripAdvisorScraper:
         selector = Selector(response.text)
         
         # Extract structured data (JSON-LD)
-        basic_data = {}
-        json_ld_scripts = selector.xpath("//script[contains(text(),'aggregateRating')]/text()").getall()
-        for script in json_ld_scripts:
-            try:
-                basic_data = json.loads(script)
-                break
-            except json.JSONDecodeError:
-                continue
+        basic_data = parse_json_ld(selector, "//script[contains(text(),'aggregateRating')]/text()")
         
         # Extract description
         description = selector.css("div.fIrGe._T::text").get()
@@ -247,32 +349,7 @@ class TripAdvisorScraper:
                 amenities.append(amenity)
         
         # Extract reviews
-        reviews = []
-        for review in selector.xpath("//div[@data-reviewid]"):
-            title = review.xpath(".//div[@data-test-target='review-title']/a/span/span/text()").get()
-            text = "".join(review.xpath(".//span[contains(@data-automation, 'reviewText')]/span/text()").extract())
-            
-            # Extract rating
-            rate = review.xpath(".//div[@data-test-target='review-rating']/span/@class").get()
-            if rate and "ui_bubble_rating" in rate:
-                try:
-                    rate_num = rate.split("ui_bubble_rating")[-1].split("_")[-1].replace("0", "")
-                    rate = int(rate_num) if rate_num.isdigit() else None
-                except:
-                    rate = None
-            else:
-                rate = None
-            
-            # Extract trip date
-            trip_data = review.xpath(".//span[span[contains(text(),'Date of stay')]]/text()").get()
-            
-            if title or text:  # Only add if we have some content
-                reviews.append({
-                    "title": title,
-                    "text": text,
-                    "rate": rate,
-                    "tripDate": trip_data
-                })
+        reviews = parse_reviews(selector, "Date of stay", "tripDate")
         
         return {
             "basic_data": basic_data,
@@ -283,13 +360,13 @@ class TripAdvisorScraper:
 
     async def scrape_hotel(self, url: str, max_review_pages: Optional[int] = None) -> Dict:
         """Scrape hotel data and reviews"""
-        log.info(f"Scraping hotel: {url}")
+        log.info("Scraping hotel: {}", url)
         
         try:
-            first_page = await self.client.get(url)
+            first_page = await self._get(url)
             first_page.raise_for_status()
         except Exception as e:
-            log.error(f"Error scraping hotel page: {e}")
+            log.error("Error scraping hotel page: {}", e)
             return {}
         
         hotel_data = self.parse_hotel_page(first_page)
@@ -318,30 +395,20 @@ class TripAdvisorScraper:
             ]
             
             if review_urls:
-                log.info(f"Scraping {len(review_urls)} additional review pages")
-                tasks = [self.client.get(review_url) for review_url in review_urls]
-                
-                for task in asyncio.as_completed(tasks):
-                    try:
-                        response = await task
-                        response.raise_for_status()
-                        page_data = self.parse_hotel_page(response)
-                        hotel_data["reviews"].extend(page_data["reviews"])
-                    except Exception as e:
-                        log.error(f"Error scraping review page: {e}")
-                        continue
-        
-        log.info(f"Scraped hotel data with {len(hotel_data.get('reviews', []))} reviews")
+                log.info("Scraping {} additional review pages", len(review_urls))
+                hotel_data["reviews"].extend(await self._scrape_review_pages(review_urls, "Date of stay", "tripDate"))
+        
+        log.info("Scraped hotel data with {} reviews", len(hotel_data.get('reviews', [])))
         return hotel_data
 
     async def scrape_search_by_type(self, query: str, search_type: str = "hotels", max_pages: Optional[int] = None) -> List[Preview]:
         """Scrape search results for different types (hotels, attractions, restaurants)"""
-        log.info(f"{query}: Scraping {search_type} search results")
+        log.info("{}: Scraping {} search results", query, search_type)
         
         try:
             location_data = (await self.scrape_location_data(query))[0]  # Take first result
         except IndexError:
-            log.error(f"Could not find location data for query {query}")
+            log.error("Could not find location data for query {}", query)
             return []
         
         # Select the appropriate URL based on search type
@@ -353,36 +420,37 @@ class TripAdvisorScraper:
         
         search_url = search_url_map.get(search_type)
         if not search_url:
-            log.error(f"No {search_type} URL found for location")
+            log.error("No {} URL found for location", search_type)
             return []
             
         full_search_url = "https://www.tripadvisor.com" + search_url
-        log.info(f"Found {search_type} search url: {full_search_url}")
+        log.info("Found {} search url: {}", search_type, full_search_url)
         
         try:
-            first_page = await self.client.get(full_search_url)
+            first_page = await self._get(full_search_url)
             first_page.raise_for_status()
         except Exception as e:
-            log.error(f"Error scraping first page: {e}")
+            log.error("Error scraping first page: {}", e)
             return []
         
-        # Parse first page using the same logic but with different selectors for each type
+        # Parse first page using the same logic but with different selectors for each type;
+        # the same tree gives the pagination metadata
+        selector = Selector(first_page.text)
         if search_type == "hotels":
-            results = self.parse_search_page(first_page)
+            results = self.parse_search_page(first_page, selector)
         elif search_type == "attractions":
-            results = self.parse_attractions_search_page(first_page)
+            results = self.parse_attractions_search_page(first_page, selector)
         elif search_type == "restaurants":
-            results = self.parse_restaurants_search_page(first_page)
+            results = self.parse_restaurants_search_page(first_page, selector)
         else:
             results = []
             
         if not results:
-            log.error(f"Query {query} found no {search_type} results")
+            log.error("Query {} found no {} results", query, search_type)
             return []
         
         # Extract pagination metadata
         page_size = len(results)
-        selector = Selector(first_page.text)
         
         # Try to find total results - different text for each type
         result_patterns = {
@@ -402,10 +470,10 @@ class TripAdvisorScraper:
             total_results = total_pages * page_size
         
         if max_pages and total_pages > max_pages:
-            log.debug(f"{query}: Only scraping {max_pages} max pages from {total_pages} total")
+            log.debug("{}: Only scraping {} max pages from {} total", query, max_pages, total_pages)
             total_pages = max_pages
         
-        log.info(f"{query}: Found {total_results} {search_type}, {page_size} per page. Scraping {total_pages} pages")
+        log.info("{}: Found {} {}, {} per page. Scraping {} pages", query, total_results, search_type, page_size, total_pages)
         
         # Get pagination URLs
         next_page_url = selector.css('a[aria-label="Next page"]::attr(href)').get()
@@ -421,7 +489,7 @@ class TripAdvisorScraper:
         ]
         
         # Scrape remaining pages concurrently
-        tasks = [self.client.get(url) for url in other_page_urls]
+        tasks = [self._get(url) for url in other_page_urls]
         for task in asyncio.as_completed(tasks):
             try:
                 response = await task
@@ -433,16 +501,17 @@ class TripAdvisorScraper:
                 elif search_type == "restaurants":
                     results.extend(self.parse_restaurants_search_page(response))
             except Exception as e:
-                log.error(f"Error scraping page: {e}")
+                log.error("Error scraping page: {}", e)
                 continue
         
         return results
 
-    def parse_attractions_search_page(self, response: httpx.Response) -> List[Preview]:
+    def parse_attractions_search_page(self, response: httpx.Response, selector: Optional[Selector] = None) -> List[Preview]:
         """Parse attraction previews from TripAdvisor search page"""
-        log.info(f"Parsing attractions search page: {response.url}")
+        log.info("Parsing attractions search page: {}", response.url)
         parsed = []
-        selector = Selector(response.text)
+        if selector is None:
+            selector = Selector(response.text)
         
         # Attractions have different selectors
         for box in selector.css("div.attraction_element, div.listing"):
@@ -469,11 +538,12 @@ class TripAdvisorScraper:
         
         return parsed
 
-    def parse_restaurants_search_page(self, response: httpx.Response) -> List[Preview]:
+    def parse_restaurants_search_page(self, response: httpx.Response, selector: Optional[Selector] = None) -> List[Preview]:
         """Parse restaurant previews from TripAdvisor search page"""
-        log.info(f"Parsing restaurants search page: {response.url}")
+        log.info("Parsing restaurants search page: {}", response.url)
         parsed = []
-        selector = Selector(response.text)
+        if selector is None:
+            selector = Selector(response.text)
         
         # Restaurants have their own selectors
         for box in selector.css("div.restaurant, div.listing"):
@@ -504,13 +574,13 @@ class TripAdvisorScraper:
 
     async def scrape_attraction(self, url: str, max_review_pages: Optional[int] = None) -> Dict:
         """Scrape attraction data and reviews"""
-        log.info(f"Scraping attraction: {url}")
+        log.info("Scraping attraction: {}", url)
         
         try:
-            first_page = await self.client.get(url)
+            first_page = await self._get(url)
             first_page.raise_for_status()
         except Exception as e:
-            log.error(f"Error scraping attraction page: {e}")
+            log.error("Error scraping attraction page: {}", e)
             return {}
         
         attraction_data = self.parse_attraction_page(first_page)
@@ -534,20 +604,10 @@ class TripAdvisorScraper:
             ]
             
             if review_urls:
-                log.info(f"Scraping {len(review_urls)} additional review pages")
-                tasks = [self.client.get(review_url) for review_url in review_urls]
-                
-                for task in asyncio.as_completed(tasks):
-                    try:
-                        response = await task
-                        response.raise_for_status()
-                        page_data = self.parse_attraction_page(response)
-                        attraction_data["reviews"].extend(page_data["reviews"])
-                    except Exception as e:
-                        log.error(f"Error scraping review page: {e}")
-                        continue
-        
-        log.info(f"Scraped attraction data with {len(attraction_data.get('reviews', []))} reviews")
+                log.info("Scraping {} additional review pages", len(review_urls))
+                attraction_data["reviews"].extend(await self._scrape_review_pages(review_urls, "Date of visit", "visitDate"))
+        
+        log.info("Scraped attraction data with {} reviews", len(attraction_data.get('reviews', [])))
         return attraction_data
 
     def parse_attraction_page(self, response: httpx.Response) -> Dict:
@@ -555,14 +615,7 @@ class TripAdvisorScraper:
         selector = Selector(response.text)
         
         # Extract JSON-LD structured data
-        basic_data = {}
-        json_ld_scripts = selector.xpath("//script[contains(text(),'aggregateRating') or contains(text(),'TouristAttraction')]/text()").getall()
-        for script in json_ld_scripts:
-            try:
-                basic_data = json.loads(script)
-                break
-            except json.JSONDecodeError:
-                continue
+        basic_data = parse_json_ld(selector, "//script[contains(text(),'aggregateRating') or contains(text(),'TouristAttraction')]/text()")
         
         # Extract description
         description = (
@@ -577,31 +630,7 @@ class TripAdvisorScraper:
             features.append(feature.get())
         
         # Extract reviews
-        reviews = []
-        for review in selector.xpath("//div[@data-reviewid]"):
-            title = review.xpath(".//div[@data-test-target='review-title']/a/span/span/text()").get()
-            text = "".join(review.xpath(".//span[contains(@data-automation, 'reviewText')]/span/text()").extract())
-            
-            # Extract rating
-            rate = review.xpath(".//div[@data-test-target='review-rating']/span/@class").get()
-            if rate and "ui_bubble_rating" in rate:
-                try:
-                    rate_num = rate.split("ui_bubble_rating")[-1].split("_")[-1].replace("0", "")
-                    rate = int(rate_num) if rate_num.isdigit() else None
-                except:
-                    rate = None
-            else:
-                rate = None
-            
-            trip_data = review.xpath(".//span[span[contains(text(),'Date of visit')]]/text()").get()
-            
-            if title or text:
-                reviews.append({
-                    "title": title,
-                    "text": text,
-                    "rate": rate,
-                    "visitDate": trip_data
-                })
+        reviews = parse_reviews(selector, "Date of visit", "visitDate")
         
         return {
             "basic_data": basic_data,
@@ -612,13 +641,13 @@ class TripAdvisorScraper:
 
     async def scrape_restaurant(self, url: str, max_review_pages: Optional[int] = None) -> Dict:
         """Scrape restaurant data and reviews"""
-        log.info(f"Scraping restaurant: {url}")
+        log.info("Scraping restaurant: {}", url)
         
         try:
-            first_page = await self.client.get(url)
+            first_page = await self._get(url)
             first_page.raise_for_status()
         except Exception as e:
-            log.error(f"Error scraping restaurant page: {e}")
+            log.error("Error scraping restaurant page: {}", e)
             return {}
         
         restaurant_data = self.parse_restaurant_page(first_page)
@@ -642,20 +671,10 @@ class TripAdvisorScraper:
             ]
             
             if review_urls:
-                log.info(f"Scraping {len(review_urls)} additional review pages")
-                tasks = [self.client.get(review_url) for review_url in review_urls]
-                
-                for task in asyncio.as_completed(tasks):
-                    try:
-                        response = await task
-                        response.raise_for_status()
-                        page_data = self.parse_restaurant_page(response)
-                        restaurant_data["reviews"].extend(page_data["reviews"])
-                    except Exception as e:
-                        log.error(f"Error scraping review page: {e}")
-                        continue
-        
-        log.info(f"Scraped restaurant data with {len(restaurant_data.get('reviews', []))} reviews")
+                log.info("Scraping {} additional review pages", len(review_urls))
+                restaurant_data["reviews"].extend(await self._scrape_review_pages(review_urls, "Date of visit", "visitDate"))
+        
+        log.info("Scraped restaurant data with {} reviews", len(restaurant_data.get('reviews', [])))
         return restaurant_data
 
     def parse_restaurant_page(self, response: httpx.Response) -> Dict:
@@ -663,14 +682,7 @@ class TripAdvisorScraper:
         selector = Selector(response.text)
         
         # Extract JSON-LD structured data
-        basic_data = {}
-        json_ld_scripts = selector.xpath("//script[contains(text(),'aggregateRating') or contains(text(),'Restaurant')]/text()").getall()
-        for script in json_ld_scripts:
-            try:
-                basic_data = json.loads(script)
-                break
-            except json.JSONDecodeError:
-                continue
+        basic_data = parse_json_ld(selector, "//script[contains(text(),'aggregateRating') or contains(text(),'Restaurant')]/text()")
         
         # Extract description
         description = (
@@ -690,31 +702,7 @@ class TripAdvisorScraper:
             features.append(f"Price Range: {price_range}")
         
         # Extract reviews
-        reviews = []
-        for review in selector.xpath("//div[@data-reviewid]"):
-            title = review.xpath(".//div[@data-test-target='review-title']/a/span/span/text()").get()
-            text = "".join(review.xpath(".//span[contains(@data-automation, 'reviewText')]/span/text()").extract())
-            
-            # Extract rating
-            rate = review.xpath(".//div[@data-test-target='review-rating']/span/@class").get()
-            if rate and "ui_bubble_rating" in rate:
-                try:
-                    rate_num = rate.split("ui_bubble_rating")[-1].split("_")[-1].replace("0", "")
-                    rate = int(rate_num) if rate_num.isdigit() else None
-                except:
-                    rate = None
-            else:
-                rate = None
-            
-            visit_data = review.xpath(".//span[span[contains(text(),'Date of visit')]]/text()").get()
-            
-            if title or text:
-                reviews.append({
-                    "title": title,
-                    "text": text,
-                    "rate": rate,
-                    "visitDate": visit_data
-                })
+        reviews = parse_reviews(selector, "Date of visit", "visitDate")
         
         return {
             "basic_data": basic_data,
@@ -741,49 +729,82 @@ class TripAdvisorScraper:
     async def scrape_by_type(self, query: str, content_type: str, max_items: Optional[int] = None, 
                            max_review_pages_per_item: Optional[int] = 3) -> List[Dict]:
         """Generic workflow for scraping different content types"""
-        log.info(f"Starting complete scrape for {content_type} in {query}")
+        log.info("Starting complete scrape for {} in {}", content_type, query)
         
         # Get search results for the specified type
         search_results = await self.scrape_search_by_type(query, content_type, max_pages=5)
         
         if not search_results:
-            log.error(f"No {content_type} search results found for {query}")
+            log.error("No {} search results found for {}", content_type, query)
             return []
         
         # Limit number of items to scrape
         if max_items:
             search_results = search_results[:max_items]
         
-        log.info(f"Found {len(search_results)} {content_type} to scrape")
+        log.info("Found {} {} to scrape", len(search_results), content_type)
+        
+        # Call appropriate scraper based on type
+        if content_type == "hotels":
+            scrape = self.scrape_hotel
+        elif content_type == "attractions":
+            scrape = self.scrape_attraction
+        elif content_type == "restaurants":
+            scrape = self.scrape_restaurant
+        else:
+            return []
+        
+        # Scrape each item's detailed data, all items at once; the limiter
+        # paces the requests, replacing the fixed delay between items
+        log.info("Scraping {} {}", len(search_results), content_type)
+        items_data = await asyncio.gather(
+            *[self._scrape_once(scrape, item_preview["url"], max_review_pages_per_item) for item_preview in search_results]
+        )
         
-        # Scrape each item's detailed data
         items_data_list = []
-        for i, item_preview in enumerate(search_results):
-            log.info(f"Scraping {content_type[:-1]} {i+1}/{len(search_results)}: {item_preview['name']}")
-            
-            # Call appropriate scraper based on type
-            if content_type == "hotels":
-                item_data = await self.scrape_hotel(item_preview["url"], max_review_pages=max_review_pages_per_item)
-            elif content_type == "attractions":
-                item_data = await self.scrape_attraction(item_preview["url"], max_review_pages=max_review_pages_per_item)
-            elif content_type == "restaurants":
-                item_data = await self.scrape_restaurant(item_preview["url"], max_review_pages=max_review_pages_per_item)
-            else:
-                continue
-            
+        for item_preview, item_data in zip(search_results, items_data):
             if item_data:
+                # Copy: the result may be shared with another category
+                item_data = dict(item_data)
                 item_data["preview"] = item_preview
                 item_data["type"] = content_type[:-1]  # Remove 's' from end
                 items_data_list.append(item_data)
-            
-            # Add delay to be respectful
-            await asyncio.sleep(1)
         
         return items_data_list
 
+    async def _scrape_review_pages(self, review_urls: List[str], date_label: str, date_key: str) -> List[Dict]:
+        """Reviews from an item's extra review pages, fetched together, in page order"""
+        responses = await asyncio.gather(*[self._get(review_url) for review_url in review_urls],
+                                         return_exceptions=True)
+        
+        reviews = []
+        for response in responses:
+            try:
+                if isinstance(response, Exception):
+                    raise response
+                response.raise_for_status()
+                # Later pages only add reviews; skip the rest of the parse
+                reviews.extend(parse_reviews(Selector(response.text), date_label, date_key))
+            except Exception as e:
+                log.error("Error scraping review page: {}", e)
+        return reviews
+
+    def _scrape_once(self, scrape, url: str, max_review_pages: Optional[int]) -> asyncio.Future:
+        """Scrape an item page at most once per parser and review budget
+        
+        The same POI can be listed under several categories; each category
+        still parses it with its own scrape_* method.
+        """
+        key = (scrape.__name__, canonical_url(url), max_review_pages)
+        task = self._item_tasks.get(key)
+        if task is None:
+            task = self._item_tasks[key] = asyncio.ensure_future(scrape(url, max_review_pages=max_review_pages))
+        return task
+
     async def close(self):
-        """Close the HTTP client"""
-        await self.client.aclose()
+        """Close the HTTP client, unless it was injected"""
+        if self._owns_client:
+            await self.client.aclose()
 
 # Example usage and testing functions
 async def test_location_search():
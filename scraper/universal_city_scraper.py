@@ -9,16 +9,18 @@ Uses GraphQL query ID: c2e5695e939386e4 for bypassing anti-bot protection
 """
 
 import asyncio
-import json
 import httpx
+import orjson
 import random
-import string
 import time
 import argparse
 import sys
 from typing import Dict, List, Optional
 from loguru import logger as log
 
+from http_client import request_id
+from rate_limiter import AIMDLimiter
+
 class UniversalCityScraper:
     def __init__(self, city_name: str, state_or_country: str = ""):
         self.city_name = city_name
@@ -38,6 +40,23 @@ class UniversalCityScraper:
             "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
             "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/605.1.15 (KHTML, like Gecko) Version/17.1 Safari/605.1.15"
         ]
+        
+        # Shared HTTP/2 client, opened by __aenter__
+        self.client: Optional[httpx.AsyncClient] = None
+        # Adaptive cap on concurrent searches; replaces a fixed 2.5s sleep
+        self._limiter = AIMDLimiter(max_concurrency=5)
+    
+    async def __aenter__(self):
+        self.client = httpx.AsyncClient(
+            http2=True,
+            timeout=httpx.Timeout(30.0),
+            limits=httpx.Limits(max_keepalive_connections=16, keepalive_expiry=30)
+        )
+        return self
+    
+    async def __aexit__(self, *exc_info):
+        await self.client.aclose()
+        self.client = None
     
     def _generate_restaurant_searches(self) -> List[str]:
         """Generate dynamic restaurant search queries for any city"""
@@ -88,9 +107,6 @@ class UniversalCityScraper:
         
         return base_searches
     
-    def generate_request_id(self, length=180):
-        return ''.join(random.choices(string.ascii_lowercase + string.digits, k=length))
-    
     def get_graphql_headers(self):
         return {
             "User-Agent": random.choice(self.user_agents),
@@ -98,7 +114,7 @@ class UniversalCityScraper:
             "Accept-Language": "en-US,en;q=0.9",
             "Accept-Encoding": "gzip, deflate, br",
             "Content-Type": "application/json",
-            "X-Requested-By": self.generate_request_id(),
+            "X-Requested-By": request_id(),
             "Referer": "https://www.tripadvisor.com/",
             "Origin": "https://www.tripadvisor.com",
             "Connection": "keep-alive",
@@ -119,7 +135,7 @@ class UniversalCityScraper:
                 name = " ".join(word.capitalize() for word in name.split())
                 return name
         except Exception as e:
-            log.error(f"Error extracting name from URL {url}: {e}")
+            log.error("Error extracting name from URL {}: {}", url, e)
         
         return f"Unknown {content_type.title()}"
     
@@ -128,7 +144,7 @@ class UniversalCityScraper:
         Search for places using GraphQL
         place_type: 'EATERY' for restaurants, 'ATTRACTION' for attractions
         """
-        log.info(f"🔍 Searching for: {search_query} ({place_type})")
+        log.info("🔍 Searching for: {} ({})", search_query, place_type)
         
         payload = [{
             "variables": {
@@ -154,128 +170,111 @@ class UniversalCityScraper:
         results = []
         
         try:
-            async with httpx.AsyncClient(
-                http2=True,
-                headers=self.get_graphql_headers(),
-                timeout=httpx.Timeout(30.0)
-            ) as client:
-                
-                response = await client.post(self.graphql_url, json=payload)
+            response = await self._limiter.run_with_retry(
+                lambda: self.client.post(self.graphql_url, json=payload, headers=self.get_graphql_headers())
+            )
+            
+            if response.status_code == 200:
+                data = response.json()
                 
-                if response.status_code == 200:
-                    data = response.json()
+                if isinstance(data, list) and len(data) > 0:
+                    autocomplete_data = data[0].get("data", {}).get("Typeahead_autocomplete", {})
+                    search_results = autocomplete_data.get("results", [])
                     
-                    if isinstance(data, list) and len(data) > 0:
-                        autocomplete_data = data[0].get("data", {}).get("Typeahead_autocomplete", {})
-                        search_results = autocomplete_data.get("results", [])
+                    for result in search_results:
+                        details = result.get("details", {})
+                        coords = result.get("coordinates", {})
                         
-                        for result in search_results:
-                            details = result.get("details", {})
-                            coords = result.get("coordinates", {})
-                            
-                            # Filter by place type
-                            result_place_type = details.get("placeType", "")
-                            url = details.get("url", "")
+                        # Filter by place type
+                        result_place_type = details.get("placeType", "")
+                        url = details.get("url", "")
+                        
+                        type_matches = {
+                            "EATERY": result_place_type == "EATERY" or "Restaurant_Review" in url,
+                            "ATTRACTION": result_place_type == "ATTRACTION" or "Attraction_Review" in url
+                        }
+                        
+                        if type_matches.get(place_type, False):
+                            # Extract name from URL if text is null
+                            name = result.get("text", "")
+                            if not name or name == "Unknown":
+                                content_type = "restaurant" if place_type == "EATERY" else "attraction"
+                                name = self.extract_name_from_url(url, content_type)
                             
-                            type_matches = {
-                                "EATERY": result_place_type == "EATERY" or "Restaurant_Review" in url,
-                                "ATTRACTION": result_place_type == "ATTRACTION" or "Attraction_Review" in url
+                            place_data = {
+                                "name": name,
+                                "tripadvisor_url": url,
+                                "location_id": result.get("locationId"),
+                                "place_type": result_place_type,
+                                "coordinates": {
+                                    "lat": coords.get("lat"),
+                                    "lng": coords.get("lng")
+                                },
+                                "address": details.get("localizedAdditionalNames", {}).get("longOnlyHierarchy", ""),
+                                "search_query": search_query,
+                                "scraped_at": time.time()
                             }
                             
-                            if type_matches.get(place_type, False):
-                                # Extract name from URL if text is null
-                                name = result.get("text", "")
-                                if not name or name == "Unknown":
-                                    content_type = "restaurant" if place_type == "EATERY" else "attraction"
-                                    name = self.extract_name_from_url(url, content_type)
-                                
-                                place_data = {
-                                    "name": name,
-                                    "tripadvisor_url": url,
-                                    "location_id": result.get("locationId"),
-                                    "place_type": result_place_type,
-                                    "coordinates": {
-                                        "lat": coords.get("lat"),
-                                        "lng": coords.get("lng")
-                                    },
-                                    "address": details.get("localizedAdditionalNames", {}).get("longOnlyHierarchy", ""),
-                                    "search_query": search_query,
-                                    "scraped_at": time.time()
-                                }
-                                
-                                results.append(place_data)
-                                content_type = "🍽️" if place_type == "EATERY" else "🎯"
-                                log.info(f"{content_type} Found: {place_data['name']}")
-                
-                elif response.status_code == 403:
-                    log.warning(f"⚠️ 403 Forbidden for {search_query} - rate limited")
-                else:
-                    log.warning(f"⚠️ Status {response.status_code} for {search_query}")
+                            results.append(place_data)
+                            content_type = "🍽️" if place_type == "EATERY" else "🎯"
+                            log.info("{} Found: {}", content_type, place_data['name'])
+            
+            elif response.status_code == 403:
+                log.warning("⚠️ 403 Forbidden for {} - rate limited", search_query)
+            else:
+                log.warning("⚠️ Status {} for {}", response.status_code, search_query)
                         
         except Exception as e:
-            log.error(f"❌ Error searching for {search_query}: {e}")
+            log.error("❌ Error searching for {}: {}", search_query, e)
         
         return results
     
-    async def scrape_restaurants(self) -> List[Dict]:
-        """Scrape all restaurants for the city"""
-        log.info(f"🍽️ Scraping restaurants for {self.location_query}")
+    async def _scrape_searches(self, searches: List[str], place_type: str) -> List[Dict]:
+        """Run the searches concurrently and merge them, deduplicated by URL"""
+        search_results = await asyncio.gather(
+            *[self.search_places(search_query, place_type) for search_query in searches],
+            return_exceptions=True
+        )
         
-        all_restaurants = []
+        all_places = []
         seen_urls = set()  # Deduplicate by URL
         
-        for search_query in self.restaurant_searches:
-            try:
-                results = await self.search_places(search_query, "EATERY")
-                
-                # Deduplicate results
-                for result in results:
-                    url = result.get("tripadvisor_url", "")
-                    if url and url not in seen_urls:
-                        seen_urls.add(url)
-                        all_restaurants.append(result)
-                
-                # Rate limiting - crucial for avoiding blocks
-                await asyncio.sleep(2.5)
-                
-            except Exception as e:
-                log.error(f"❌ Failed to search {search_query}: {e}")
+        # Merge in query order so the output doesn't depend on which
+        # search finished first
+        for search_query, results in zip(searches, search_results):
+            if isinstance(results, Exception):
+                log.error("❌ Failed to search {}: {}", search_query, results)
                 continue
+            
+            for result in results:
+                url = result.get("tripadvisor_url", "")
+                if url and url not in seen_urls:
+                    seen_urls.add(url)
+                    all_places.append(result)
+        
+        return all_places
+    
+    async def scrape_restaurants(self) -> List[Dict]:
+        """Scrape all restaurants for the city"""
+        log.info("🍽️ Scraping restaurants for {}", self.location_query)
         
-        log.info(f"✅ Found {len(all_restaurants)} unique restaurants")
+        all_restaurants = await self._scrape_searches(self.restaurant_searches, "EATERY")
+        
+        log.info("✅ Found {} unique restaurants", len(all_restaurants))
         return all_restaurants
     
     async def scrape_attractions(self) -> List[Dict]:
         """Scrape all attractions for the city"""
-        log.info(f"🎯 Scraping attractions for {self.location_query}")
-        
-        all_attractions = []
-        seen_urls = set()  # Deduplicate by URL
+        log.info("🎯 Scraping attractions for {}", self.location_query)
         
-        for search_query in self.attraction_searches:
-            try:
-                results = await self.search_places(search_query, "ATTRACTION")
-                
-                # Deduplicate results
-                for result in results:
-                    url = result.get("tripadvisor_url", "")
-                    if url and url not in seen_urls:
-                        seen_urls.add(url)
-                        all_attractions.append(result)
-                
-                # Rate limiting
-                await asyncio.sleep(2.5)
-                
-            except Exception as e:
-                log.error(f"❌ Failed to search {search_query}: {e}")
-                continue
+        all_attractions = await self._scrape_searches(self.attraction_searches, "ATTRACTION")
         
-        log.info(f"✅ Found {len(all_attractions)} unique attractions")
+        log.info("✅ Found {} unique attractions", len(all_attractions))
         return all_attractions
     
     async def scrape_all(self) -> Dict:
         """Scrape both restaurants and attractions for the city"""
-        log.info(f"🚀 Starting comprehensive scraping for {self.location_query}")
+        log.info("🚀 Starting comprehensive scraping for {}", self.location_query)
         
         # Scrape both types
         restaurants = await self.scrape_restaurants()
@@ -313,7 +312,7 @@ class UniversalCityScraper:
             "scraping_metadata": {
                 "restaurant_search_queries": self.restaurant_searches,
                 "attraction_search_queries": self.attraction_searches,
-                "rate_limit_delay": 2.5,
+                "max_concurrent_searches": self._limiter.max_concurrency,
                 "deduplication": "by_tripadvisor_url",
                 "data_source": "tripadvisor_graphql"
             }
@@ -336,26 +335,27 @@ def main():
         scraper = UniversalCityScraper(args.city, args.state)
         
         try:
-            if args.type == "all":
-                data = await scraper.scrape_all()
-            elif args.type == "restaurants":
-                restaurants = await scraper.scrape_restaurants()
-                data = {
-                    "city": args.city,
-                    "type": "restaurants_only",
-                    "restaurants": restaurants,
-                    "total": len(restaurants),
-                    "scraped_at": time.time()
-                }
-            elif args.type == "attractions":
-                attractions = await scraper.scrape_attractions()
-                data = {
-                    "city": args.city,
-                    "type": "attractions_only", 
-                    "attractions": attractions,
-                    "total": len(attractions),
-                    "scraped_at": time.time()
-                }
+            async with scraper:
+                if args.type == "all":
+                    data = await scraper.scrape_all()
+                elif args.type == "restaurants":
+                    restaurants = await scraper.scrape_restaurants()
+                    data = {
+                        "city": args.city,
+                        "type": "restaurants_only",
+                        "restaurants": restaurants,
+                        "total": len(restaurants),
+                        "scraped_at": time.time()
+                    }
+                elif args.type == "attractions":
+                    attractions = await scraper.scrape_attractions()
+                    data = {
+                        "city": args.city,
+                        "type": "attractions_only", 
+                        "attractions": attractions,
+                        "total": len(attractions),
+                        "scraped_at": time.time()
+                    }
             
             # Save results
             if args.output:
@@ -365,8 +365,8 @@ def main():
                 timestamp = int(time.time())
                 filename = f"{city_clean}_tripadvisor_data_{timestamp}.json"
             
-            with open(filename, 'w', encoding='utf-8') as f:
-                json.dump(data, f, indent=2, ensure_ascii=False)
+            with open(filename, 'wb') as f:
+                f.write(orjson.dumps(data, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS))
             
             # Print summary
             print(f"\n🎯 SCRAPING COMPLETE: {args.city}")
@@ -385,7 +385,7 @@ def main():
             return data
             
         except Exception as e:
-            log.error(f"❌ Scraping failed: {e}")
+            log.error("❌ Scraping failed: {}", e)
             return None
     
     return asyncio.run(run_scraper())